@@ -82,3 +82,7 @@ API_PORT = 8000
 LLM_RATE_LIMIT_REQUESTS_PER_MINUTE = 60
 LLM_MIN_REQUEST_INTERVAL = 0.1
 
+# Offline tagging (tag_all_players.py): batches in flight at once; the client's limiter still caps RPM
+TAG_CONCURRENCY = int(os.getenv("TAG_CONCURRENCY", "4"))
+# Players per tagging prompt; clamped to PlayerTagger.MAX_BATCH_SIZE
+TAG_BATCH_SIZE = int(os.getenv("TAG_BATCH_SIZE", "10"))
@@ -121,17 +121,13 @@ class BiasModeler:
     
     def get_bias_score(self, player_name: str, target_team: str) -> float:
         """Get stored bias score or 0."""
-        key = (player_name, target_team)
-        if key in self.bias_relationships:
-            return self.bias_relationships[key].bias_score
-        return 0.0
+        relationship = self.bias_relationships.get((player_name, target_team))
+        return relationship.bias_score if relationship is not None else 0.0
     
     def get_bias_reason(self, player_name: str, target_team: str) -> str:
         """Get bias reason."""
-        key = (player_name, target_team)
-        if key in self.bias_relationships:
-            return self.bias_relationships[key].performance_summary
-        return ""
+        relationship = self.bias_relationships.get((player_name, target_team))
+        return relationship.performance_summary if relationship is not None else ""
     
     def get_all_biases_for_player(self, player_name: str) -> List[BiasRelationship]:
         """Get all bias relationships for a player."""
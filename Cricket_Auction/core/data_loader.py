@@ -9,14 +9,23 @@ from models.player import Player
 from models.team import Team
 
 
+# Supply.csv row fields, compiled once instead of looked up in re's cache per row
+_NAME_RE = re.compile(r'Name:\s*([^|]+)')
+_BASE_PRICE_RE = re.compile(r'BasePrice:\s*(\d+)L')
+_COUNTRY_RE = re.compile(r'Country:\s*([^|]+)')
+_BATTING_HAND_RE = re.compile(r'(LHB|RHB)')
+_BOWLING_STYLE_RE = re.compile(r'(LEFT|RIGHT)\s+ARM\s+([^|]+)')
+_ARM_RE = re.compile(r'(LEFT|RIGHT)\s+ARM')
+
+
 def parse_supply_csv(file_path: str) -> List[Player]:
     """Parse Supply.csv and return list of Player objects."""
     players = []
     
     with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-        # Skip first line (header "Supply")
-        for line in lines[1:]:
+        # Skip first line (header "Supply"), then stream the rest
+        next(f, None)
+        for line in f:
             line = line.strip()
             if not line:
                 continue
@@ -25,11 +34,11 @@ def parse_supply_csv(file_path: str) -> List[Player]:
             # Sl.No: 1|Set.No: 1|Name: Devon Conway|BasePrice: 200L|Country: New Zealand|LHB|
             
             # Extract fields using regex
-            name_match = re.search(r'Name:\s*([^|]+)', line)
-            base_price_match = re.search(r'BasePrice:\s*(\d+)L', line)
-            country_match = re.search(r'Country:\s*([^|]+)', line)
-            batting_hand_match = re.search(r'(LHB|RHB)', line)
-            bowling_style_match = re.search(r'(LEFT|RIGHT)\s+ARM\s+([^|]+)', line)
+            name_match = _NAME_RE.search(line)
+            base_price_match = _BASE_PRICE_RE.search(line)
+            country_match = _COUNTRY_RE.search(line)
+            batting_hand_match = _BATTING_HAND_RE.search(line)
+            bowling_style_match = _BOWLING_STYLE_RE.search(line)
             
             if not name_match or not base_price_match or not country_match:
                 continue
@@ -44,9 +53,9 @@ def parse_supply_csv(file_path: str) -> List[Player]:
                 arm = bowling_style_match.group(1)
                 style = bowling_style_match.group(2).strip()
                 bowling_style = f"{arm} ARM {style}"
-            elif re.search(r'(LEFT|RIGHT)\s+ARM', line):
+            else:
                 # Fallback: just extract ARM type
-                arm_match = re.search(r'(LEFT|RIGHT)\s+ARM', line)
+                arm_match = _ARM_RE.search(line)
                 if arm_match:
                     bowling_style = arm_match.group(0)
             
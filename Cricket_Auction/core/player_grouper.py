@@ -1,6 +1,6 @@
 """Player grouping system - LLM-driven based on team context (no hardcoded thresholds)."""
 
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Dict, List, Any, Tuple, Optional, AbstractSet, Sequence
 from models.player import Player
 from models.team import Team
 from core.recommender import Recommender
@@ -174,8 +174,9 @@ class PlayerGrouper:
     def get_grouped_recommendations(
         self,
         team: Team,
-        available_players: List[Player],
-        limit_per_group: int = 10
+        available_players: Sequence[Player],
+        limit_per_group: int = 10,
+        available_player_names: Optional[AbstractSet[str]] = None
     ) -> Dict[str, List[Dict[str, Any]]]:
         """Get grouped recommendations for a team."""
         if not self.recommender:
@@ -183,7 +184,9 @@ class PlayerGrouper:
             return self._get_heuristic_recommendations(team, available_players, limit_per_group)
         
         # Get recommendations from LLM-based recommender
-        recommendations = self.recommender.recommend_for_team(team, available_players, limit=30)
+        recommendations = self.recommender.recommend_for_team(
+            team, available_players, limit=30, available_player_names=available_player_names
+        )
         
         # Group them
         groups = self.group_players(team, recommendations)
@@ -2,8 +2,9 @@
 
 import csv
 import json
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable, Iterator
 from models.player import Player, PrimaryRole, BattingRole, BowlingRole, Speciality, Quality, PhaseMetrics
 
 
@@ -220,9 +221,23 @@ class PlayerTagStorage:
             if not (append and file_exists):
                 writer.writeheader()
             
-            for player in players:
-                row = self.player_to_csv_row(player)
-                writer.writerow(row)
+            writer.writerows(self.player_to_csv_row(player) for player in players)
+    
+    @contextmanager
+    def open_append(self) -> Iterator[Callable[[List[Player]], None]]:
+        """Keep the CSV open for a run of appends; yields a function that appends (and flushes) a list of players."""
+        file_exists = self.csv_path.exists()
+        with open(self.csv_path, 'a', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            writer = csv.DictWriter(f, fieldnames=self.get_csv_headers())
+            if not file_exists:
+                writer.writeheader()
+            
+            def write_players(players: List[Player]):
+                writer.writerows(self.player_to_csv_row(player) for player in players)
+                # Flush per call so rows written so far survive an interrupted run
+                f.flush()
+            
+            yield write_players
     
     def load_players(self) -> Dict[str, Player]:
         """Load all tagged players from CSV."""
@@ -247,14 +262,14 @@ class PlayerTagStorage:
         if not self.csv_path.exists():
             return []
         
-        names = []
-        with open(self.csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('name'):
-                    names.append(row['name'])
-        
-        return names
+        with open(self.csv_path, 'r', encoding='utf-8', newline='') as f:
+            # Plain reader and one column: no per-row dict for a names-only scan
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header or 'name' not in header:
+                return []
+            name_idx = header.index('name')
+            return [row[name_idx] for row in reader if len(row) > name_idx and row[name_idx]]
     
     def update_player(self, player: Player):
         """Update a single player in CSV (removes old entry and adds new)."""
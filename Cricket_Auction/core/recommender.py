@@ -1,18 +1,31 @@
 """Recommendation engine with formatted output."""
 
-from typing import Dict, List, Any, Optional
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, List, Any, Optional, AbstractSet, Sequence, TYPE_CHECKING
 from models.player import Player
 from models.team import Team
-from llm.team_matcher import TeamMatcher
 from core.bias_modeler import BiasModeler
 
+if TYPE_CHECKING:
+    # Annotation only; importing it pulls in the Gemini client stack
+    from llm.team_matcher import TeamMatcher
+
 
 class Recommender:
     """Generate player recommendations for teams."""
     
-    def __init__(self, team_matcher: TeamMatcher):
-        """Initialize recommender."""
+    def __init__(self, team_matcher: 'TeamMatcher', executor: Optional[Executor] = None):
+        """Initialize recommender (executor: shared pool for concurrent LLM matching)."""
         self.team_matcher = team_matcher
+        self.executor = executor
+    
+    def _match_or_exception(self, player: Player, team: Team) -> Any:
+        """Match one player to a team, returning the exception instead of raising it."""
+        try:
+            return self.team_matcher.match_player_to_team(player, team)
+        except Exception as e:
+            return e
     
     def recommend_player(
         self,
@@ -119,8 +132,9 @@ class Recommender:
     def recommend_for_team(
         self,
         team: Team,
-        available_players: List[Player],
-        limit: int = 10
+        available_players: Sequence[Player],
+        limit: int = 10,
+        available_player_names: Optional[AbstractSet[str]] = None
     ) -> List[Dict[str, Any]]:
         """Get recommendations for a specific team (ONLY from available supply players)."""
         print(f"[RECOMMENDER] recommend_for_team called")
@@ -133,19 +147,30 @@ class Recommender:
             print("[RECOMMENDER] ERROR: TeamMatcher is None!")
             return []
         
-        # Create set of available player names for quick validation
-        available_player_names = {p.name for p in available_players}
+        # Set of available player names for quick validation (callers fanning
+        # out over teams pass a shared precomputed set)
+        if available_player_names is None:
+            available_player_names = {p.name for p in available_players}
         
         recommendations = []
         processed = 0
         errors = 0
         
-        for i, player in enumerate(available_players):
+        # Each match is an independent LLM call; fan them out on the shared executor
+        # when one was provided (results still come back in player order)
+        match = partial(self._match_or_exception, team=team)
+        outcomes = self.executor.map(match, available_players) if self.executor else map(match, available_players)
+        
+        for i, (player, match_result) in enumerate(zip(available_players, outcomes)):
             if i % 10 == 0:
                 print(f"[RECOMMENDER] Processing player {i+1}/{len(available_players)}: {player.name}")
             
+            if isinstance(match_result, Exception):
+                errors += 1
+                print(f"[RECOMMENDER] Exception matching {player.name}: {str(match_result)}")
+                continue
+            
             try:
-                match_result = self.team_matcher.match_player_to_team(player, team)
                 processed += 1
                 
                 if match_result.get('error'):
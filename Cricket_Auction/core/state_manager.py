@@ -1,10 +1,13 @@
 """State manager for real-time auction state updates."""
 
-from typing import Optional, List
+import threading
+from itertools import count
+from typing import Optional, List, Dict, Any, Iterable, Tuple, FrozenSet
 from models.auction_state import AuctionState
 from models.player import Player
 from models.team import Team
-import json
+from utils import normalize_team_name
+import orjson
 from pathlib import Path
 
 
@@ -14,16 +17,84 @@ class StateManager:
     def __init__(self, auction_state: Optional[AuctionState] = None):
         """Initialize state manager."""
         self.state = auction_state or AuctionState()
+        # Serializes sales now that sync endpoints run on worker threads
+        self._lock = threading.Lock()
+        # Monotonic version stamps so callers can cache per-team derived data
+        self._version_counter = count(1)
+        self._team_versions = {}
+        self._reset_version = 0
+        # Snapshot of the supply (read from AuctionState's own name index);
+        # None means "rebuild from self.state on next read"
+        self._available_players_cache: Optional[Tuple[Player, ...]] = None
+        self._available_names_cache: Optional[FrozenSet[str]] = None
+        # Normalized team name -> key in self.state.teams; None means rebuild
+        self._team_index: Optional[Dict[str, str]] = None
+    
+    def version(self, team_name: str) -> int:
+        """Get the current state version for a team (changes whenever the team changes)."""
+        return self._team_versions.get(team_name, self._reset_version)
+    
+    def _bump_version(self, team_name: str):
+        """Mark a team as changed."""
+        self._team_versions[team_name] = next(self._version_counter)
+    
+    def _bump_all_versions(self):
+        """Mark every team as changed (state replaced wholesale)."""
+        self._team_versions.clear()
+        self._reset_version = next(self._version_counter)
     
     def sell_player(self, player_name: str, team_name: str, price: int, timestamp: Optional[str] = None):
         """Sell a player and update state immediately."""
+        with self._lock:
+            self._sell_player(player_name, team_name, price, timestamp)
+    
+    def sell_players_bulk(self, updates: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Apply many sales under a single lock acquisition, collecting per-row errors."""
+        results = {
+            'success': [],
+            'errors': []
+        }
+        
+        # Bind hot-loop lookups once; imports can run to many thousands of rows
+        success = results['success']
+        errors = results['errors']
+        sell = self._sell_player
+        
+        with self._lock:
+            for update in updates:
+                player_name = update.get('player_name')
+                team_name = update.get('team')
+                price = update.get('price')
+                
+                if not player_name or not team_name or not price:
+                    errors.append({
+                        'update': update,
+                        'error': 'Missing required fields'
+                    })
+                    continue
+                
+                try:
+                    sell(player_name, team_name, price, update.get('timestamp'))
+                    success.append(update)
+                except Exception as e:
+                    errors.append({
+                        'update': update,
+                        'error': str(e)
+                    })
+        
+        return results
+    
+    def _sell_player(self, player_name: str, team_name: str, price: int, timestamp: Optional[str] = None):
+        """Validate and record a sale; caller must hold the lock."""
         player = self.state.get_player(player_name)
         if not player:
             raise ValueError(f"Player {player_name} not found in available supply")
         
-        if team_name not in self.state.teams:
+        resolved_name = self.resolve_team_name(team_name)
+        if resolved_name is None:
             raise ValueError(f"Team {team_name} not found")
         
+        team_name = resolved_name
         team = self.state.teams[team_name]
         
         # Check if team can afford
@@ -40,16 +111,22 @@ class StateManager:
         
         # Record sale
         self.state.add_sold_player(player, team_name, price, timestamp)
+        self._bump_version(team_name)
+        self._invalidate_available()
     
     def update_team_purse(self, team_name: str, amount: int):
         """Update team purse (deduct amount)."""
-        if team_name not in self.state.teams:
-            raise ValueError(f"Team {team_name} not found")
-        self.state.update_team_purse(team_name, amount)
+        with self._lock:
+            if team_name not in self.state.teams:
+                raise ValueError(f"Team {team_name} not found")
+            self.state.update_team_purse(team_name, amount)
+            self._bump_version(team_name)
     
     def remove_from_supply(self, player_name: str):
         """Remove player from available supply."""
-        self.state.remove_from_supply(player_name)
+        with self._lock:
+            self.state.remove_from_supply(player_name)
+            self._invalidate_available()
     
     def get_player(self, player_name: str) -> Optional[Player]:
         """Get player by name."""
@@ -59,9 +136,46 @@ class StateManager:
         """Get team by name."""
         return self.state.get_team(team_name)
     
-    def get_available_players(self) -> List[Player]:
-        """Get all available players."""
-        return self.state.available_players
+    def resolve_team_name(self, raw_name: str) -> Optional[str]:
+        """Resolve a raw/alias team name (e.g. 'chennai') to its key in state, or None."""
+        if self._team_index is None:
+            self._team_index = {normalize_team_name(name): name for name in self.state.teams}
+        return self._team_index.get(normalize_team_name(raw_name))
+    
+    def resolve_team(self, raw_name: str) -> Optional[Team]:
+        """Get team by raw/alias name."""
+        resolved_name = self.resolve_team_name(raw_name)
+        return self.state.teams.get(resolved_name) if resolved_name is not None else None
+    
+    def get_available_players(self) -> Tuple[Player, ...]:
+        """Get all available players (a cached, read-only snapshot safe to share across threads)."""
+        players = self._available_players_cache
+        if players is None:
+            players, _ = self.get_available_snapshot()
+        return players
+    
+    def get_available_player_names(self) -> FrozenSet[str]:
+        """Get the names of all available players (cached alongside the snapshot)."""
+        names = self._available_names_cache
+        if names is None:
+            _, names = self.get_available_snapshot()
+        return names
+    
+    def get_available_snapshot(self) -> Tuple[Tuple[Player, ...], FrozenSet[str]]:
+        """Get the available players and their names, taken together so no sale can fall between them."""
+        # Built under the lock: sales mutate the index, and a snapshot started before a
+        # sale must not be stored after it
+        with self._lock:
+            if self._available_players_cache is None or self._available_names_cache is None:
+                players = tuple(self.state.available_players)
+                self._available_players_cache = players
+                self._available_names_cache = frozenset(p.name for p in players)
+            return self._available_players_cache, self._available_names_cache
+    
+    def _invalidate_available(self):
+        """Discard the cached supply snapshot (after a sale, removal or state replacement)."""
+        self._available_players_cache = None
+        self._available_names_cache = None
     
     def get_sold_players(self) -> List:
         """Get all sold players."""
@@ -78,18 +192,26 @@ class StateManager:
     def export_state(self, file_path: str):
         """Export state to JSON file."""
         state_dict = self.state.to_dict()
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(state_dict, f, indent=2, ensure_ascii=False)
+        Path(file_path).write_bytes(orjson.dumps(state_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     
     def import_state(self, file_path: str):
         """Import state from JSON file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            state_dict = json.load(f)
-        self.state = AuctionState.from_dict(state_dict)
+        state_dict = orjson.loads(Path(file_path).read_bytes())
+        state = AuctionState.from_dict(state_dict)
+        with self._lock:
+            self.state = state
+            self._bump_all_versions()
+            self._invalidate_available()
+            self._team_index = None
     
     def reset_state(self, players: List[Player], teams: dict):
         """Reset state with new players and teams."""
-        self.state = AuctionState()
-        self.state.available_players = players
-        self.state.teams = teams
+        state = AuctionState()
+        state.available_players = players
+        state.teams = teams
+        with self._lock:
+            self.state = state
+            self._bump_all_versions()
+            self._invalidate_available()
+            self._team_index = None
 
@@ -1,9 +1,9 @@
 """REST API handler using FastAPI."""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from pydantic import BaseModel
 from core.state_manager import StateManager
 from core.recommender import Recommender
@@ -13,6 +13,7 @@ from handlers.team_selection_handler import TeamSelectionHandler
 from handlers.live_bid_handler import LiveBidHandler
 from utils import parse_price_string, normalize_team_name
 import logging
+import orjson
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -38,6 +39,14 @@ class ChatRequest(BaseModel):
     context: Optional[Dict[str, Any]] = None
 
 
+# Fixed-shape response body for /teams/{team}/weak-points; each field is
+# serialized on its own and spliced in, skipping jsonable_encoder entirely.
+WEAK_POINTS_TEMPLATE = (
+    b'{"team":%s,"weak_points":%s,"batting_order_gaps":%s,'
+    b'"bowling_phase_gaps":%s,"purse_available_cr":%s}'
+)
+
+
 # These will be set during initialization
 state_manager: Optional[StateManager] = None
 recommender: Optional[Recommender] = None
@@ -47,20 +56,23 @@ team_selection_handler: Optional[TeamSelectionHandler] = None
 live_bid_handler: Optional[LiveBidHandler] = None
 components: Optional[Dict[str, Any]] = None
 
+# /chat team context keyed by (team_name, state version) -> (context, analysis).
+# A sale bumps the team's version, so stale entries are never hit again.
+_context_cache: Dict[Tuple[str, int], Tuple[str, Dict[str, Any]]] = {}
+
 
 # Lifespan context manager for FastAPI startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle startup and shutdown events."""
     # Startup
-    print("\n" + "=" * 60)
-    print("[API_HANDLER] FastAPI startup - Initializing system...")
+    logger.info("FastAPI startup - initializing system...")
     try:
-        from main import initialize_system
+        from main import get_system_components
         global state_manager, recommender, player_grouper, matrix_generator
         global team_selection_handler, live_bid_handler, components
         
-        components = initialize_system()
+        components = get_system_components()
         initialize_handlers(
             components['state_manager'],
             components['recommender'],
@@ -68,18 +80,18 @@ async def lifespan(app: FastAPI):
             components['matrix_generator']
         )
         set_components(components)
-        print("[API_HANDLER] System initialized successfully!")
-        print("=" * 60 + "\n")
+        logger.info("System initialized successfully")
     except Exception as e:
-        print(f"[API_HANDLER] ERROR during startup: {e}")
-        import traceback
-        print(traceback.format_exc())
-        print("=" * 60 + "\n")
+        logger.exception("[API_HANDLER] ERROR during startup: %s", e)
     
     yield
     
     # Shutdown
-    print("[API_HANDLER] FastAPI shutdown")
+    logger.info("FastAPI shutdown")
+    if live_bid_handler is not None:
+        live_bid_handler.close()
+    if components and components.get('live_bid_handler') not in (None, live_bid_handler):
+        components['live_bid_handler'].close()
 
 
 # Initialize FastAPI app with lifespan
@@ -117,24 +129,19 @@ def initialize_handlers(
     global state_manager, recommender, player_grouper, matrix_generator
     global team_selection_handler, live_bid_handler
     
-    print("=" * 60)
-    print("[API_HANDLER] Initializing handlers...")
-    print(f"[API_HANDLER] StateManager: {sm is not None}")
-    print(f"[API_HANDLER] Recommender: {rec is not None}")
-    print(f"[API_HANDLER] PlayerGrouper: {pg is not None}")
-    print(f"[API_HANDLER] MatrixGenerator: {mg is not None}")
+    logger.debug(
+        "Initializing handlers: StateManager=%s Recommender=%s PlayerGrouper=%s MatrixGenerator=%s",
+        sm is not None, rec is not None, pg is not None, mg is not None
+    )
     
     state_manager = sm
+    _context_cache.clear()
     recommender = rec
     player_grouper = pg
     matrix_generator = mg
     team_selection_handler = TeamSelectionHandler(sm, rec, pg)
     live_bid_handler = LiveBidHandler(sm, rec, pg)
-    
-    print(f"[API_HANDLER] TeamSelectionHandler: {team_selection_handler is not None}")
-    print(f"[API_HANDLER] LiveBidHandler: {live_bid_handler is not None}")
-    print("[API_HANDLER] Handlers initialized successfully!")
-    print("=" * 60)
+    logger.info("Handlers initialized")
 
 
 def set_components(comps: Dict[str, Any]):
@@ -165,48 +172,45 @@ async def sell_player(request: SellRequest):
 @app.get("/teams/{team}/matrix")
 async def get_team_matrix(team: str):
     """Get team matrix."""
-    print(f"\n[API] GET /teams/{team}/matrix")
+    logger.debug("GET /teams/%s/matrix", team)
     
     # Validate initialization
     if not matrix_generator:
-        print(f"[API] ERROR: Matrix generator not initialized")
+        logger.error("/matrix called before the matrix generator was initialized")
         raise HTTPException(status_code=500, detail="Matrix generator not initialized. Server startup incomplete.")
     
     if not state_manager:
-        print(f"[API] ERROR: State manager not initialized")
+        logger.error("/matrix called without a state manager")
         raise HTTPException(status_code=500, detail="State manager not initialized. Server startup incomplete.")
     
     try:
         # Normalize and validate team name
         team_name = normalize_team_name(team)
-        print(f"[API] Normalized team name: {team_name}")
+        logger.debug("Normalized team name: %s", team_name)
         
         # Get team object
         try:
             team_obj = state_manager.get_team(team_name)
         except Exception as e:
-            print(f"[API] ERROR getting team object: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[API] ERROR getting team object: %s", e)
             raise HTTPException(status_code=500, detail=f"Error retrieving team: {str(e)}")
         
-        print(f"[API] Team found: {team_obj is not None}")
-        
         if not team_obj:
             available_teams = list(state_manager.get_all_teams().keys())
-            print(f"[API] ERROR: Team {team_name} not found. Available teams: {available_teams}")
+            logger.warning("/matrix team %s not found", team_name)
             raise HTTPException(
                 status_code=404, 
                 detail=f"Team '{team_name}' not found. Available teams: {', '.join(available_teams)}"
             )
         
         # Generate matrix with detailed error handling
-        print(f"[API] Generating matrix for {team_name}...")
+        logger.debug("Generating matrix for %s", team_name)
         try:
             matrix_text = matrix_generator.generate_team_matrix(team_obj)
             if not matrix_text:
                 raise ValueError("Matrix generator returned empty result")
-            print(f"[API] Matrix generated successfully ({len(matrix_text)} chars)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Matrix generated (%d chars)", len(matrix_text))
             
             return {
                 "success": True,
@@ -214,9 +218,7 @@ async def get_team_matrix(team: str):
                 "team": team_name
             }
         except Exception as e:
-            print(f"[API] ERROR in matrix generation: {type(e).__name__}: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("[API] ERROR in matrix generation: %s: %s", type(e).__name__, e)
             raise HTTPException(
                 status_code=500, 
                 detail=f"Matrix generation failed: {type(e).__name__}: {str(e)}"
@@ -225,9 +227,7 @@ async def get_team_matrix(team: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[API] UNEXPECTED ERROR: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[API] UNEXPECTED ERROR: %s: %s", type(e).__name__, e)
         raise HTTPException(
             status_code=500, 
             detail=f"Unexpected error: {type(e).__name__}: {str(e)}"
@@ -237,42 +237,30 @@ async def get_team_matrix(team: str):
 @app.get("/teams/{team}/recommendations")
 async def get_team_recommendations(team: str, group: Optional[str] = None):
     """Get grouped recommendations for a team (includes gap analysis first)."""
-    print("\n" + "=" * 60)
-    print(f"[API] GET /teams/{team}/recommendations")
-    print(f"[API] Group filter: {group}")
-    print(f"[API] TeamSelectionHandler exists: {team_selection_handler is not None}")
-    print(f"[API] StateManager exists: {state_manager is not None}")
+    logger.debug("GET /teams/%s/recommendations group=%s", team, group)
     
     if not team_selection_handler or not state_manager:
-        print("[API] ERROR: Handler not initialized!")
+        logger.error("/recommendations called before the handlers were initialized")
         raise HTTPException(status_code=500, detail="Handler not initialized")
     
     from core.playing11_analyzer import Playing11Analyzer
     
     team_name = normalize_team_name(team)
-    print(f"[API] Normalized team name: {team_name}")
-    
     team_obj = state_manager.get_team(team_name)
-    print(f"[API] Team object found: {team_obj is not None}")
     
     if not team_obj:
-        print(f"[API] ERROR: Team {team_name} not found")
+        logger.warning("/recommendations team %s not found", team_name)
         raise HTTPException(status_code=404, detail=f"Team {team_name} not found")
     
     # First, analyze gaps and weak points
-    print("[API] Analyzing team gaps...")
     analyzer = Playing11Analyzer()
     gap_analysis = analyzer.analyze_team(team_obj)
-    print(f"[API] Gap analysis complete. Total gaps: {gap_analysis.get('gaps', {}).get('total_gaps', 0)}")
     
     # Then get recommendations
-    print("[API] Getting team recommendations...")
     result = team_selection_handler.get_team_recommendations(team, filter_group=group)
-    print(f"[API] Recommendations result keys: {list(result.keys()) if isinstance(result, dict) else 'Not a dict'}")
-    print(f"[API] Result has error: {result.get('error') if isinstance(result, dict) else 'N/A'}")
     
     if result.get('error'):
-        print(f"[API] ERROR in result: {result['error']}")
+        logger.warning("/recommendations error for %s: %s", team_name, result['error'])
         raise HTTPException(status_code=404, detail=result['error'])
     
     # Add gap analysis to result
@@ -289,16 +277,17 @@ async def get_team_recommendations(team: str, group: Optional[str] = None):
         'total_gaps': gap_analysis['gaps'].get('total_gaps', 0)
     }
     
-    # Log result summary
-    if isinstance(result, dict) and 'groups' in result:
-        groups = result.get('groups', {})
-        print(f"[API] Groups returned: {list(groups.keys())}")
-        for group_name, group_data in groups.items():
-            count = len(group_data) if isinstance(group_data, list) else 0
-            print(f"[API]   Group {group_name}: {count} recommendations")
-    
-    print(f"[API] Returning result with {len(result)} keys")
-    print("=" * 60 + "\n")
+    # Log result summary (only assembled when someone is listening at DEBUG)
+    if logger.isEnabledFor(logging.DEBUG) and 'groups' in result:
+        logger.debug(
+            "/recommendations for %s: total gaps %d, %s",
+            team_name,
+            result['gap_analysis']['total_gaps'],
+            ", ".join(
+                f"{group_name}={len(group_data) if isinstance(group_data, list) else 0}"
+                for group_name, group_data in result['groups'].items()
+            )
+        )
     
     return result
 
@@ -309,16 +298,19 @@ async def get_state():
     if not state_manager:
         raise HTTPException(status_code=500, detail="State manager not initialized")
     
-    return {
+    # Serialize with orjson directly rather than letting FastAPI walk the nested
+    # team dicts through jsonable_encoder and then the stdlib json encoder
+    content = orjson.dumps({
         "supply_count": state_manager.get_supply_count(),
         "sold_count": len(state_manager.get_sold_players()),
         "teams": {name: team.to_dict() for name, team in state_manager.get_all_teams().items()}
-    }
+    })
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/live/recommendations")
-async def get_live_recommendations():
-    """Get live recommendations for all teams."""
+def get_live_recommendations():
+    """Get live recommendations for all teams (sync so FastAPI runs it in its threadpool)."""
     if not live_bid_handler:
         raise HTTPException(status_code=500, detail="Handler not initialized")
     
@@ -376,36 +368,66 @@ async def get_team_weak_points(team: str):
     analyzer = Playing11Analyzer()
     analysis = analyzer.analyze_team(team_obj)
     
-    return {
-        "team": team_name,
-        "weak_points": analysis.get('weak_points', []),
-        "batting_order_gaps": [
+    content = WEAK_POINTS_TEMPLATE % (
+        orjson.dumps(team_name),
+        orjson.dumps(analysis.get('weak_points', [])),
+        orjson.dumps([
             bo for bo in analysis.get('batting_order', []) 
             if bo.get('status') == 'NotCheck'
-        ],
-        "bowling_phase_gaps": [
+        ]),
+        orjson.dumps([
             bp for bp in analysis.get('bowling_phases', []) 
             if bp.get('status') == 'NotCheck'
-        ],
-        "purse_available_cr": analysis.get('purse_available_cr', 0)
-    }
+        ]),
+        orjson.dumps(analysis.get('purse_available_cr', 0))
+    )
+    return Response(content=content, media_type="application/json")
+
+
+def _build_team_context(team_name: str, team_analysis: Dict[str, Any]) -> str:
+    """Format the team analysis block used as /chat context for the LLM."""
+    context_parts = [
+        f"=== TEAM ANALYSIS FOR {team_name} ===",
+        f"Purse Available: {team_analysis.get('purse_available_cr', 0):.2f} Cr",
+        f"Available Slots: {team_analysis.get('available_slots', 0)}"
+    ]
+    
+    weak_points = team_analysis.get('weak_points', [])
+    if weak_points:
+        context_parts.append(f"\nWEAK POINTS ({len(weak_points)}):")
+        for wp in weak_points:
+            context_parts.append(f"  • {wp.get('category', 'Unknown')} ({wp.get('severity', 'Medium')}): {wp.get('details', 'N/A')}")
+    
+    batting_gaps = [bo for bo in team_analysis.get('batting_order', []) if bo.get('status') == 'NotCheck']
+    if batting_gaps:
+        context_parts.append(f"\nBATTING GAPS ({len(batting_gaps)}):")
+        for bo in batting_gaps:
+            context_parts.append(f"  • Position {bo.get('position', 'N/A')}: Need {bo.get('speciality', 'batsman')}")
+    
+    bowling_gaps = [bp for bp in team_analysis.get('bowling_phases', []) if bp.get('status') == 'NotCheck']
+    if bowling_gaps:
+        context_parts.append(f"\nBOWLING GAPS ({len(bowling_gaps)}):")
+        for bp in bowling_gaps:
+            context_parts.append(f"  • {bp.get('phase', 'N/A')}: Need primary bowler")
+    
+    return "\n".join(context_parts)
 
 
 @app.post("/chat")
 async def chat_with_recommender(request: ChatRequest):
     """Chat with the recommender system."""
-    print("\n" + "=" * 60)
-    print(f"[API] POST /chat")
-    print(f"[API] Message: {request.message[:100]}..." if len(request.message) > 100 else f"[API] Message: {request.message}")
-    print(f"[API] Team name: {request.team_name}")
-    print(f"[API] Components exists: {components is not None}")
+    message = request.message
+    requested_team = request.team_name
+    extra_context = request.context
+    
+    logger.debug("POST /chat team=%s message=%.100s", requested_team, message)
     
     if not components:
-        print("[API] ERROR: System components not initialized!")
+        logger.error("/chat called before system components were initialized")
         raise HTTPException(status_code=500, detail="System components not initialized")
     
     if not state_manager:
-        print("[API] ERROR: State manager not available!")
+        logger.error("/chat called without a state manager")
         raise HTTPException(status_code=500, detail="State manager not available")
     
     from core.playing11_analyzer import Playing11Analyzer
@@ -415,65 +437,41 @@ async def chat_with_recommender(request: ChatRequest):
     team_analysis = None
     
     # If team specified, include team analysis (ALWAYS do this for team context)
-    if request.team_name:
-        print(f"[API] Processing team context for: {request.team_name}")
-        team_name = normalize_team_name(request.team_name)
+    if requested_team:
+        team_name = normalize_team_name(requested_team)
         team = state_manager.get_team(team_name)
-        print(f"[API] Team found: {team is not None}")
         
         if team:
-            print("[API] Analyzing team...")
-            analyzer = Playing11Analyzer()
-            team_analysis = analyzer.analyze_team(team)
-            print(f"[API] Team analysis complete. Weak points: {len(team_analysis.get('weak_points', []))}")
-            
-            # Format team context for AI
-            context_parts.append(f"=== TEAM ANALYSIS FOR {team_name} ===")
-            context_parts.append(f"Purse Available: {team_analysis.get('purse_available_cr', 0):.2f} Cr")
-            context_parts.append(f"Available Slots: {team_analysis.get('available_slots', 0)}")
-            
-            weak_points = team_analysis.get('weak_points', [])
-            if weak_points:
-                context_parts.append(f"\nWEAK POINTS ({len(weak_points)}):")
-                for wp in weak_points:
-                    context_parts.append(f"  • {wp.get('category', 'Unknown')} ({wp.get('severity', 'Medium')}): {wp.get('details', 'N/A')}")
-            
-            batting_gaps = [bo for bo in team_analysis.get('batting_order', []) if bo.get('status') == 'NotCheck']
-            if batting_gaps:
-                context_parts.append(f"\nBATTING GAPS ({len(batting_gaps)}):")
-                for bo in batting_gaps:
-                    context_parts.append(f"  • Position {bo.get('position', 'N/A')}: Need {bo.get('speciality', 'batsman')}")
-            
-            bowling_gaps = [bp for bp in team_analysis.get('bowling_phases', []) if bp.get('status') == 'NotCheck']
-            if bowling_gaps:
-                context_parts.append(f"\nBOWLING GAPS ({len(bowling_gaps)}):")
-                for bp in bowling_gaps:
-                    context_parts.append(f"  • {bp.get('phase', 'N/A')}: Need primary bowler")
-            
-            print(f"[API] Context parts added: {len(context_parts)} items")
+            cache_key = (team_name, state_manager.version(team_name))
+            cached = _context_cache.get(cache_key)
+            if cached is None:
+                team_analysis = Playing11Analyzer().analyze_team(team)
+                # Drop this team's stale entries before storing the fresh one
+                for key in [k for k in _context_cache if k[0] == team_name]:
+                    del _context_cache[key]
+                cached = (_build_team_context(team_name, team_analysis), team_analysis)
+                _context_cache[cache_key] = cached
+            team_context, team_analysis = cached
+            context_parts.append(team_context)
         else:
-            print(f"[API] WARNING: Team {team_name} not found in state manager")
-            context_parts.append(f"Team '{request.team_name}' not found in database.")
+            logger.warning("/chat team %s not found in state manager", team_name)
+            context_parts.append(f"Team '{requested_team}' not found in database.")
     
     # Add custom context if provided
-    if request.context:
-        print(f"[API] Adding custom context: {request.context}")
-        context_parts.append(f"\nAdditional Context: {request.context}")
+    if extra_context:
+        context_parts.append(f"\nAdditional Context: {extra_context}")
     
     context_str = "\n".join(context_parts) if context_parts else ""
-    print(f"[API] Total context length: {len(context_str)} characters")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("/chat context length: %d characters", len(context_str))
     
     # Try to use LLM if available, otherwise return structured response
     gemini_client = components.get('gemini_client')
-    print(f"[API] GeminiClient available: {gemini_client is not None}")
     
     if gemini_client:
         try:
-            print("[API] Loading system prompt...")
-            from llm.prompt_loader import PromptLoader
-            prompt_loader = PromptLoader()
-            system_prompt = prompt_loader.load_prompt()
-            print(f"[API] System prompt loaded: {len(system_prompt)} characters")
+            from llm.prompt_loader import get_default_loader
+            system_prompt = get_default_loader().load_prompt()
             
             # Build chat prompt with context
             chat_prompt = f"""{system_prompt}
@@ -482,7 +480,7 @@ async def chat_with_recommender(request: ChatRequest):
 {context_str}
 
 === USER QUESTION ===
-{request.message}
+{message}
 
 === INSTRUCTIONS ===
 Answer the user's question based on the team context provided. If they ask about gaps, 
@@ -490,40 +488,33 @@ recommend specific players from the available pool that would fill those gaps. B
 and actionable in your recommendations.
 """
             
-            print(f"[API] Total prompt length: {len(chat_prompt)} characters")
-            print("[API] Calling Gemini API...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("/chat prompt length: %d characters", len(chat_prompt))
             
             response = gemini_client.generate_content(chat_prompt)
-            print(f"[API] Gemini response received: {len(response) if response else 0} characters")
-            print(f"[API] Response preview: {response[:100] if response else 'None'}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("/chat Gemini response: %d characters", len(response) if response else 0)
             
             result = {
                 "response": response,
-                "team": request.team_name,
+                "team": requested_team,
                 "context_provided": bool(context_parts),
                 "source": "llm"
             }
-            print("[API] Chat response successful!")
-            print("=" * 60 + "\n")
             return result
             
-        except Exception as e:
-            print(f"[API] ERROR with Gemini: {str(e)}")
-            print(f"[API] Exception type: {type(e).__name__}")
-            import traceback
-            print(f"[API] Traceback: {traceback.format_exc()}")
-            print("[API] Falling back to structured response...")
+        except Exception:
+            logger.exception("Chat generation failed; falling back to structured response")
             # Fall through to structured response below
     
     # Fallback: Return structured response from team analysis
-    print("[API] Returning fallback structured response...")
     
     if team_analysis:
         weak_points = team_analysis.get('weak_points', [])
         batting_gaps = [bo for bo in team_analysis.get('batting_order', []) if bo.get('status') == 'NotCheck']
         bowling_gaps = [bp for bp in team_analysis.get('bowling_phases', []) if bp.get('status') == 'NotCheck']
         
-        response_text = f"## {request.team_name} Analysis\n\n"
+        response_text = f"## {requested_team} Analysis\n\n"
         response_text += f"**Purse Available:** {team_analysis.get('purse_available_cr', 0):.2f} Cr\n"
         response_text += f"**Available Slots:** {team_analysis.get('available_slots', 0)}\n\n"
         
@@ -545,18 +536,16 @@ and actionable in your recommendations.
                 response_text += f"- **{bp.get('phase', 'N/A')}**: Need primary bowler\n"
             response_text += "\n"
         
-        response_text += f"**User Question:** {request.message}\n"
+        response_text += f"**User Question:** {message}\n"
         response_text += "\n(Note: LLM features are not available. Please use the recommender endpoint for player suggestions.)"
     else:
-        response_text = f"Team context not found. Your question: {request.message}\n\nPlease select a team from the dropdown and try again."
+        response_text = f"Team context not found. Your question: {message}\n\nPlease select a team from the dropdown and try again."
     
     result = {
         "response": response_text,
-        "team": request.team_name,
+        "team": requested_team,
         "context_provided": bool(context_parts),
         "source": "fallback"
     }
-    print("[API] Fallback response returned!")
-    print("=" * 60 + "\n")
     return result
 
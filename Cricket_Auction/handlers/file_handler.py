@@ -1,11 +1,18 @@
 """File handler for batch updates."""
 
 import csv
-import json
-from typing import List, Dict, Any
+import orjson
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from pathlib import Path
 from core.state_manager import StateManager
-from utils import parse_price_string, normalize_team_name
+from utils import parse_price_string
+
+
+def _cell(row: List[str], index: Optional[int]) -> str:
+    """Get a CSV cell by column index, or '' if the column or cell is missing."""
+    if index is None or index >= len(row):
+        return ''
+    return row[index]
 
 
 class FileHandler:
@@ -15,26 +22,39 @@ class FileHandler:
         """Initialize file handler."""
         self.state_manager = state_manager
     
+    def iter_from_csv(self, file_path: str) -> Iterator[Dict[str, Any]]:
+        """Yield auction updates from CSV file one row at a time."""
+        with open(file_path, 'r', encoding='utf-8', newline='', buffering=1 << 20) as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            
+            # Resolve column positions once instead of building a dict per row
+            columns = {name: i for i, name in enumerate(header)}
+            player_idx = columns.get('player_name')
+            team_idx = columns.get('team')
+            price_idx = columns.get('price')
+            timestamp_idx = columns.get('timestamp')
+            
+            for row in reader:
+                if not row:
+                    continue
+                yield {
+                    'player_name': _cell(row, player_idx).strip(),
+                    # Resolved against the team index when the sale is applied
+                    'team': _cell(row, team_idx).strip(),
+                    'price': parse_price_string(_cell(row, price_idx)),
+                    'timestamp': _cell(row, timestamp_idx)
+                }
+    
     def load_from_csv(self, file_path: str) -> List[Dict[str, Any]]:
         """Load auction updates from CSV file."""
-        updates = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                updates.append({
-                    'player_name': row.get('player_name', '').strip(),
-                    'team': normalize_team_name(row.get('team', '').strip()),
-                    'price': parse_price_string(row.get('price', '')),
-                    'timestamp': row.get('timestamp', '')
-                })
-        
-        return updates
+        return list(self.iter_from_csv(file_path))
     
     def load_from_json(self, file_path: str) -> List[Dict[str, Any]]:
         """Load auction updates from JSON file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = orjson.loads(Path(file_path).read_bytes())
         
         if isinstance(data, list):
             return data
@@ -43,35 +63,9 @@ class FileHandler:
         else:
             return []
     
-    def apply_updates(self, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Apply batch updates to state."""
-        results = {
-            'success': [],
-            'errors': []
-        }
-        
-        for update in updates:
-            player_name = update.get('player_name')
-            team_name = update.get('team')
-            price = update.get('price')
-            
-            if not all([player_name, team_name, price]):
-                results['errors'].append({
-                    'update': update,
-                    'error': 'Missing required fields'
-                })
-                continue
-            
-            try:
-                self.state_manager.sell_player(player_name, team_name, price, update.get('timestamp'))
-                results['success'].append(update)
-            except Exception as e:
-                results['errors'].append({
-                    'update': update,
-                    'error': str(e)
-                })
-        
-        return results
+    def apply_updates(self, updates: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply batch updates to state (accepts a list or a lazy iterator such as iter_from_csv)."""
+        return self.state_manager.sell_players_bulk(updates)
     
     def export_state(self, file_path: str):
         """Export current state to file."""
@@ -1,15 +1,21 @@
 """Live bid-by-bid mode handler."""
 
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, AbstractSet, Sequence
+from models.player import Player
+from models.team import Team
 from core.state_manager import StateManager
 from core.recommender import Recommender
 from core.player_grouper import PlayerGrouper
-from utils import parse_price_string, normalize_team_name
+from utils import parse_price_string
 
 
 class LiveBidHandler:
     """Handle live bid-by-bid auction tracking."""
     
+    # Per-team work is dominated by LLM round-trips, not CPU, so size for one worker per franchise
+    MAX_WORKERS = 10
+    
     def __init__(
         self,
         state_manager: StateManager,
@@ -22,6 +28,12 @@ class LiveBidHandler:
         self.player_grouper = player_grouper
         self.bid_count = 0
         self.previous_recommendations = {}
+        # Long-lived pool so each bid doesn't pay thread start-up cost
+        self._pool = ThreadPoolExecutor(max_workers=self.MAX_WORKERS, thread_name_prefix='live-bid')
+    
+    def close(self):
+        """Shut down the per-team worker pool."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
     
     def process_bid(self, player_name: str, team_name: str, price: str) -> Dict[str, Any]:
         """Process a bid and return updated recommendations."""
@@ -32,7 +44,7 @@ class LiveBidHandler:
         if not price_lakhs:
             return {'error': f"Invalid price: {price}"}
         
-        team_name = normalize_team_name(team_name)
+        team_name = self.state_manager.resolve_team_name(team_name) or team_name
         
         # Record sale
         try:
@@ -56,15 +68,30 @@ class LiveBidHandler:
     def get_all_teams_recommendations(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
         """Get grouped recommendations for all teams."""
         teams = self.state_manager.get_all_teams()
-        available_players = self.state_manager.get_available_players()
-        
-        all_recommendations = {}
+        # One read-only snapshot (and name set) shared by every team worker
+        available_players, available_names = self.state_manager.get_available_snapshot()
         
-        for team_name, team in teams.items():
-            groups = self.player_grouper.get_grouped_recommendations(team, available_players, limit_per_group=3)
-            all_recommendations[team_name] = groups
+        if not teams:
+            return {}
         
-        return all_recommendations
+        # Each team is scored independently (read-only over the shared
+        # supply snapshot), so fan the teams out across the pool.
+        futures = {
+            team_name: self._pool.submit(self._recommend_for_team, team, available_players, available_names)
+            for team_name, team in teams.items()
+        }
+        return {team_name: future.result() for team_name, future in futures.items()}
+    
+    def _recommend_for_team(
+        self,
+        team: Team,
+        available_players: Sequence[Player],
+        available_names: AbstractSet[str]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get grouped recommendations for a single team."""
+        return self.player_grouper.get_grouped_recommendations(
+            team, available_players, limit_per_group=3, available_player_names=available_names
+        )
     
     def format_bid_result(self, result: Dict[str, Any]) -> str:
         """Format bid result for display."""
@@ -1,11 +1,45 @@
 """Team selection mode handler."""
 
-from typing import Dict, List, Any, Optional
+import logging
+import re
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from models.team import Team
 from core.state_manager import StateManager
 from core.recommender import Recommender
 from core.player_grouper import PlayerGrouper
-from utils import normalize_team_name
+
+logger = logging.getLogger(__name__)
+
+# "11-14", "11 - 14" or a single "12"; anything else (e.g. "N/A") is unparseable
+_RANGE_RE = re.compile(r'^\s*(\d+(?:\.\d*)?)\s*(?:-\s*(\d+(?:\.\d*)?))?\s*$')
+
+
+@lru_cache(maxsize=512)
+def _parse_price_range(price_str: str) -> Optional[Tuple[float, float]]:
+    """Parse a fair-price range string into (min, max) crores, or None if unparseable."""
+    match = _RANGE_RE.match(price_str)
+    if not match:
+        return None
+    price_min = float(match.group(1))
+    price_max = float(match.group(2)) if match.group(2) else price_min
+    return price_min, price_max
+
+
+def _within_price_filter(rec: Dict[str, Any], price_lo: Optional[float], price_hi: Optional[float]) -> bool:
+    """Check whether a recommendation's fair-price range overlaps the filter."""
+    # Parses are memoized per distinct range string, so recs don't need to carry the bounds
+    bounds = _parse_price_range(str(rec.get('fair_price_range', '0-0')))
+    if bounds is None:
+        # Keep recs whose price can't be parsed rather than hiding them; a "0-0"
+        # range parses and is filtered like any other
+        return True
+    price_min, price_max = bounds
+    if price_lo and price_max < price_lo:
+        return False
+    if price_hi and price_min > price_hi:
+        return False
+    return True
 
 
 class TeamSelectionHandler:
@@ -30,30 +64,23 @@ class TeamSelectionHandler:
         filter_price_max: Optional[float] = None
     ) -> Dict[str, Any]:
         """Get recommendations for a team."""
-        print(f"[TEAM_SELECTION] Getting recommendations for team: {team_name}")
-        print(f"[TEAM_SELECTION] Filter group: {filter_group}")
-        print(f"[TEAM_SELECTION] StateManager exists: {self.state_manager is not None}")
-        print(f"[TEAM_SELECTION] Recommender exists: {self.recommender is not None}")
-        print(f"[TEAM_SELECTION] PlayerGrouper exists: {self.player_grouper is not None}")
-        
-        team_name = normalize_team_name(team_name)
-        print(f"[TEAM_SELECTION] Normalized team name: {team_name}")
+        logger.debug("Getting recommendations for team: %s (filter group: %s)", team_name, filter_group)
         
-        team = self.state_manager.get_team(team_name)
-        print(f"[TEAM_SELECTION] Team found: {team is not None}")
+        team = self.state_manager.resolve_team(team_name)
         
         if not team:
-            print(f"[TEAM_SELECTION] ERROR: Team {team_name} not found")
+            logger.error("Team %s not found", team_name)
             return {'error': f"Team {team_name} not found"}
         
-        print(f"[TEAM_SELECTION] Team details - Purse: {team.purse_available/100:.2f} Cr, Slots: {team.available_slots}")
+        team_name = team.name
+        
+        logger.debug("Team %s - Purse: %.2f Cr, Slots: %d", team_name, team.purse_available / 100, team.available_slots)
         
-        print("[TEAM_SELECTION] Getting available players...")
         available_players = self.state_manager.get_available_players()
-        print(f"[TEAM_SELECTION] Available players count: {len(available_players)}")
+        logger.debug("Available players count: %d", len(available_players))
         
         if not available_players:
-            print("[TEAM_SELECTION] WARNING: No available players!")
+            logger.warning("No available players for %s", team_name)
             return {
                 'team': team_name,
                 'purse': team.purse_available / 100.0,
@@ -63,59 +90,35 @@ class TeamSelectionHandler:
                 'error': 'No available players'
             }
         
-        print("[TEAM_SELECTION] Getting grouped recommendations...")
         groups = self.player_grouper.get_grouped_recommendations(team, available_players)
-        print(f"[TEAM_SELECTION] Groups returned: {list(groups.keys())}")
-        for group_name, group_data in groups.items():
-            count = len(group_data) if isinstance(group_data, list) else 0
-            print(f"[TEAM_SELECTION]   Group {group_name}: {count} recommendations")
+        if logger.isEnabledFor(logging.DEBUG):
+            for group_name, group_data in groups.items():
+                logger.debug("Group %s: %d recommendations", group_name, len(group_data) if isinstance(group_data, list) else 0)
         
         # Apply filters
         if filter_group:
-            print(f"[TEAM_SELECTION] Applying group filter: {filter_group}")
             if filter_group.upper() in groups:
                 groups = {filter_group.upper(): groups[filter_group.upper()]}
-                print(f"[TEAM_SELECTION] Filtered to group {filter_group.upper()}: {len(groups[filter_group.upper()])} items")
             else:
-                print(f"[TEAM_SELECTION] ERROR: Invalid group {filter_group}")
+                logger.error("Invalid group %s", filter_group)
                 return {'error': f"Invalid group: {filter_group}. Use A, B, or C"}
         
         # Filter by price if specified
         if filter_price_min or filter_price_max:
-            print(f"[TEAM_SELECTION] Applying price filter: {filter_price_min} - {filter_price_max}")
+            logger.debug("Applying price filter: %s - %s", filter_price_min, filter_price_max)
             for group_name in groups:
-                filtered = []
-                for rec in groups[group_name]:
-                    price_str = rec.get('fair_price_range', '0-0')
-                    # Parse price range
-                    try:
-                        parts = price_str.split('-')
-                        price_min = float(parts[0]) if parts else 0
-                        price_max = float(parts[1]) if len(parts) > 1 else price_min
-                        
-                        if filter_price_min and price_max < filter_price_min:
-                            continue
-                        if filter_price_max and price_min > filter_price_max:
-                            continue
-                        
-                        filtered.append(rec)
-                    except:
-                        filtered.append(rec)
-                groups[group_name] = filtered
-                print(f"[TEAM_SELECTION] Group {group_name} after price filter: {len(filtered)} items")
+                groups[group_name] = [
+                    rec for rec in groups[group_name]
+                    if _within_price_filter(rec, filter_price_min, filter_price_max)
+                ]
         
-        result = {
+        return {
             'team': team_name,
             'purse': team.purse_available / 100.0,
             'slots': team.available_slots,
             'groups': groups,
             'formatted': self.player_grouper.format_grouped_recommendations(team, groups)
         }
-        
-        print(f"[TEAM_SELECTION] Returning result with {len(result)} keys")
-        print(f"[TEAM_SELECTION] Total recommendations across all groups: {sum(len(g) if isinstance(g, list) else 0 for g in groups.values())}")
-        
-        return result
     
     def list_all_teams(self) -> List[str]:
         """List all available teams."""
@@ -1,9 +1,12 @@
 """Google Gemini API client with rate limiting and caching."""
 
+import hashlib
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
-from functools import lru_cache
+from functools import lru_cache, partial
 import json
 from pathlib import Path
 
@@ -15,6 +18,12 @@ except ImportError:
     print("Warning: google-generativeai not installed. LLM features will be disabled.")
 
 
+@lru_cache(maxsize=1024)
+def _cache_key(prompt: str) -> str:
+    """Hash a prompt into a cache key (memoized for prompts repeated across calls)."""
+    return hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+
+
 class GeminiClient:
     """Gemini API client with rate limiting and caching."""
     
@@ -29,61 +38,108 @@ class GeminiClient:
         
         genai.configure(api_key=self.api_key)
         self.model_name = model_name
+        # Built once and reused for every call: the SDK caches its transport
+        # client per process, so repeated requests share the same connection.
         self.model = genai.GenerativeModel(model_name)
         
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.1  # 100ms between requests
+        # Rate limiting: token bucket refilled at max_requests_per_minute
         self.request_count = 0
         self.max_requests_per_minute = 60
+        self._rate = self.max_requests_per_minute / 60.0  # tokens per second
+        self._tokens = float(self.max_requests_per_minute)
+        self._last_refill = time.monotonic()
+        self._rate_lock = threading.Lock()
         
-        # Caching
+        # Caching: append-only JSONL log, compacted when mostly superseded lines
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_file = self.cache_dir / "cache.jsonl"
+        self.legacy_cache_file = self.cache_dir / "cache.json"
         self._cache = {}
+        self._cache_log_lines = 0
+        self._cache_lock = threading.Lock()
         self._load_cache()
     
     def _load_cache(self):
-        """Load cache from disk."""
-        cache_file = self.cache_dir / "cache.json"
-        if cache_file.exists():
+        """Load cache from the JSONL log (later lines win)."""
+        # The legacy md5-keyed cache.json is not loaded: its keys can never match a
+        # blake2b key, and its prompts are unknown so the entries can't be re-keyed
+        if self.cache_file.exists():
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    self._cache = json.load(f)
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            entry = json.loads(line)
+                            self._cache[entry['k']] = entry['v']
+                        except (ValueError, KeyError, TypeError):
+                            # Torn write from an interrupted run, or a malformed entry; skip the line
+                            continue
+                        self._cache_log_lines += 1
             except Exception as e:
                 print(f"Warning: Could not load cache: {e}")
-                self._cache = {}
     
-    def _save_cache(self):
-        """Save cache to disk."""
-        cache_file = self.cache_dir / "cache.json"
+    def _append_cache_entry(self, cache_key: str, content: str):
+        """Append one entry to the cache log (O(1) per write)."""
+        with self._cache_lock:
+            try:
+                with open(self.cache_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'k': cache_key, 'v': content}, ensure_ascii=False) + "\n")
+                self._cache_log_lines += 1
+            except Exception as e:
+                print(f"Warning: Could not save cache: {e}")
+                return
+            
+            if self._cache_log_lines > 2 * len(self._cache):
+                self._compact_cache_locked()
+    
+    def compact_cache(self):
+        """Rewrite the cache log with one line per live entry."""
+        with self._cache_lock:
+            self._compact_cache_locked()
+    
+    def _compact_cache_locked(self):
+        """Rewrite the cache log; caller must hold the cache lock."""
+        tmp_file = self.cache_file.with_suffix('.jsonl.tmp')
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._cache, f, indent=2, ensure_ascii=False)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for key, value in list(self._cache.items()):
+                    f.write(json.dumps({'k': key, 'v': value}, ensure_ascii=False) + "\n")
+            os.replace(tmp_file, self.cache_file)
+            self._cache_log_lines = len(self._cache)
         except Exception as e:
-            print(f"Warning: Could not save cache: {e}")
+            print(f"Warning: Could not compact cache: {e}")
     
     def _get_cache_key(self, prompt: str) -> str:
         """Generate cache key from prompt."""
-        import hashlib
-        return hashlib.md5(prompt.encode()).hexdigest()
+        return _cache_key(prompt)
+    
+    def _reserve_request_slot(self) -> float:
+        """Take a token from the bucket and return how long to wait before sending (0 if none)."""
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.max_requests_per_minute),
+                self._tokens + (now - self._last_refill) * self._rate
+            )
+            self._last_refill = now
+            # Going negative reserves a future token, so concurrent callers queue up in order
+            self._tokens -= 1
+            self.request_count += 1
+            return -self._tokens / self._rate if self._tokens < 0 else 0.0
     
     def _rate_limit(self):
         """Apply rate limiting."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        
-        self.last_request_time = time.time()
-        self.request_count += 1
+        wait = self._reserve_request_slot()
+        if wait > 0:
+            time.sleep(wait)
     
     def generate_content(self, prompt: str, use_cache: bool = True, **kwargs) -> str:
         """Generate content using Gemini API with caching and rate limiting."""
         # Check cache
+        cache_key = self._get_cache_key(prompt) if use_cache else None
         if use_cache:
-            cache_key = self._get_cache_key(prompt)
             if cache_key in self._cache:
                 return self._cache[cache_key]
         
@@ -97,33 +153,61 @@ class GeminiClient:
             
             # Cache result
             if use_cache:
-                cache_key = self._get_cache_key(prompt)
                 self._cache[cache_key] = content
-                self._save_cache()
+                self._append_cache_entry(cache_key, content)
             
             return content
         except Exception as e:
             print(f"Error generating content: {e}")
             raise
     
-    def generate_content_batch(self, prompts: list, use_cache: bool = True, **kwargs) -> list:
-        """Generate content for multiple prompts."""
-        results = []
-        for prompt in prompts:
-            try:
-                result = self.generate_content(prompt, use_cache=use_cache, **kwargs)
-                results.append(result)
-            except Exception as e:
-                print(f"Error processing prompt: {e}")
-                results.append(None)
+    def _generate_or_none(self, prompt: str, use_cache: bool = True, **kwargs) -> Optional[str]:
+        """Generate content for one batch prompt, or None if the call fails."""
+        try:
+            return self.generate_content(prompt, use_cache=use_cache, **kwargs)
+        except Exception as e:
+            print(f"Error processing prompt: {e}")
+            return None
+    
+    def generate_content_batch(self, prompts: list, use_cache: bool = True, max_concurrency: int = 10, **kwargs) -> list:
+        """Generate content for multiple prompts concurrently (None for prompts that fail)."""
+        results = [None] * len(prompts)
+        # Unique uncached prompt -> every position it occupies in the batch
+        pending = {}
+        
+        # Serve cache hits up front so they don't take a worker
+        for i, prompt in enumerate(prompts):
+            if prompt in pending:
+                pending[prompt].append(i)
+                continue
+            if use_cache:
+                cached = self._cache.get(self._get_cache_key(prompt))
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            pending[prompt] = [i]
+        
+        if pending:
+            # Sync calls on threads: the SDK's async transport is bound to the first event
+            # loop it runs on, so a fresh asyncio.run per batch can't reuse it. The token
+            # bucket in generate_content still paces the workers.
+            generate = partial(self._generate_or_none, use_cache=use_cache, **kwargs)
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(pending))) as executor:
+                outcomes = executor.map(generate, pending)
+                for positions, outcome in zip(pending.values(), outcomes):
+                    for i in positions:
+                        results[i] = outcome
+        
         return results
     
     def clear_cache(self):
         """Clear the cache."""
-        self._cache = {}
-        cache_file = self.cache_dir / "cache.json"
-        if cache_file.exists():
-            cache_file.unlink()
+        with self._cache_lock:
+            self._cache = {}
+            self._cache_log_lines = 0
+            for cache_file in (self.cache_file, self.legacy_cache_file):
+                if cache_file.exists():
+                    cache_file.unlink()
     
     def get_cache_size(self) -> int:
         """Get number of cached entries."""
@@ -1,60 +1,45 @@
 """LLM-based player tagging system using Gemini."""
 
+import random
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
-from models.player import Player, PrimaryRole, BattingRole, BowlingRole, Speciality, Quality
+from models.player import Player, PrimaryRole, BattingRole, BowlingRole, Speciality, Quality, PhaseMetrics
 from llm.gemini_client import GeminiClient
-from llm.prompt_loader import PromptLoader
-import json
-import re
+from llm.prompt_loader import get_default_loader
+from utils import extract_json_span
+import orjson
 
 
-class PlayerTagger:
-    """Tag players using LLM analysis."""
-    
-    def __init__(self, gemini_client: GeminiClient):
-        """Initialize tagger."""
-        self.client = gemini_client
-        self.prompt_loader = PromptLoader()
-    
-    def create_tagging_prompt(self, player: Player, stats_data: Optional[Dict[str, Any]] = None) -> str:
-        """Create prompt for LLM player tagging using AuctionPrompt.md."""
-        # Load system context from AuctionPrompt.md
-        system_context = self.prompt_loader.get_tagging_context()
-        
-        # Build advanced metrics string
-        metrics_str = "N/A"
-        if player.advanced_metrics:
-            pp = player.advanced_metrics.powerplay or {}
-            mo = player.advanced_metrics.middle_overs or {}
-            death = player.advanced_metrics.death or {}
-            metrics_str = f"""
-Advanced Metrics:
-- Powerplay: efscore={pp.get('efscore', 'N/A')}, winp={pp.get('winp', 'N/A')}, raa={pp.get('raa', 'N/A')}
-- Middle Overs: efscore={mo.get('efscore', 'N/A')}, winp={mo.get('winp', 'N/A')}, raa={mo.get('raa', 'N/A')}
-- Death: efscore={death.get('efscore', 'N/A')}, winp={death.get('winp', 'N/A')}, raa={death.get('raa', 'N/A')}
-"""
-        
-        # Build conditions performance string
-        conditions_str = "N/A"
-        if player.performance_by_conditions:
-            conditions_str = f"Performance by conditions: {json.dumps(player.performance_by_conditions, indent=2)}"
-        
-        # Build stats string
-        stats_str = ""
-        if stats_data:
-            stats_str = f"\nAdditional Stats: {json.dumps(stats_data, indent=2)}"
-        
-        prompt = f"""{system_context}
+# Single-valued tags: LLM key (== Player attribute) and a value -> member map
+# for its enum, so tags resolve with one dict lookup and unknown LLM output is
+# skipped without raising
+_ENUM_TAGS = tuple(
+    (attr, {member.value: member for member in enum_cls})
+    for attr, enum_cls in (
+        ('primary_role', PrimaryRole),
+        ('batting_role', BattingRole),
+        ('bowling_role', BowlingRole),
+        ('speciality', Speciality),
+        ('quality', Quality),
+    )
+)
+
+_METRIC_PHASES = ('powerplay', 'middle_overs', 'death')
+
+# Prompt skeletons, filled with format_map; the system context prefix is
+# identical across calls
+_TAGGING_TEMPLATE = """{system_context}
 
 === PLAYER ANALYSIS TASK ===
 
 Using the instructions from AuctionPrompt.md above, analyze this cricket player and assign comprehensive tags following Step a), b), and c):
 
-Player: {player.name}
-Country: {player.country}
-Batting Hand: {player.batting_hand or 'Unknown'}
-Bowling Style: {player.bowling_style or 'N/A'}
-Base Price: {player.base_price}L
+Player: {name}
+Country: {country}
+Batting Hand: {batting_hand}
+Bowling Style: {bowling_style}
+Base Price: {base_price}L
 
 {metrics_str}
 
@@ -62,7 +47,59 @@ Match Conditions Performance:
 {conditions_str}
 {stats_str}
 
-=== ASSIGNMENT REQUIREMENTS ===
+{requirements}"""
+
+_BATCH_TAGGING_TEMPLATE = """{system_context}
+
+=== BATCH PLAYER ANALYSIS TASK ===
+
+Using the instructions from AuctionPrompt.md above, analyze the following {player_count} cricket players and assign comprehensive tags following Step a), b), and c).
+
+{players_section}
+
+{requirements}"""
+
+# Rough prompt budget for one batch call (~4 characters per token), leaving
+# headroom under the model's input limit
+_CHARS_PER_TOKEN = 4
+_MAX_BATCH_PROMPT_TOKENS = 28000
+
+# Ask Gemini for a bare JSON body instead of JSON wrapped in prose/markdown
+_JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+# Transient API failures (rate limit / overload / timeout) on a batch call are
+# retried with jittered exponential backoff before falling back to one call per player
+try:
+    from google.api_core import exceptions as _api_exceptions
+    _TRANSIENT_ERRORS = (
+        _api_exceptions.ResourceExhausted,
+        _api_exceptions.ServiceUnavailable,
+        _api_exceptions.DeadlineExceeded,
+        TimeoutError,
+    )
+except ImportError:
+    _TRANSIENT_ERRORS = (TimeoutError,)
+_BATCH_RETRY_ATTEMPTS = 4
+_BATCH_RETRY_BASE_DELAY = 1.0  # seconds; doubles per attempt
+_BATCH_RETRY_MAX_DELAY = 30.0
+
+# Phase-wise metric guidance shared by the single and batch prompts
+_ADV_METRICS_SPEC = """- **efscore** (Expected Runs vs Actual): 0-200, where 100 = average
+  * Powerplay: 100-150 for openers/PP specialists, 80-120 for others
+  * Middle Overs: 100-140 for middle-order/anchors, 80-120 for others
+  * Death: 100-160 for finishers/death specialists, 80-120 for others
+- **winp** (Win Probability Added): 0.0-1.0, where 0.5 = neutral
+  * Powerplay: 0.4-0.6 for specialists, 0.45-0.55 for others
+  * Middle Overs: 0.45-0.65 for key players, 0.45-0.55 for others
+  * Death: 0.5-0.7 for finishers, 0.45-0.55 for others
+- **raa** (Runs Above Average): Typically -20 to +30
+  * Powerplay: +5 to +15 for good openers, -5 to +5 for others
+  * Middle Overs: +5 to +20 for strong middle-order, -5 to +5 for others
+  * Death: +10 to +25 for finishers, -5 to +5 for others
+"""
+
+# Static tail of the single-player tagging prompt
+_TAGGING_REQUIREMENTS = """=== ASSIGNMENT REQUIREMENTS ===
 
 Based on Step a) - Assign detailed batting and bowling tags:
 - Detailed batting tags (if applicable): Use hashtag format like #Opener, #Top3Anchor, #MiddleOrder, #Finisher, #PowerHitter, #SpinHitter, #PlaysPaceWell, #PlaysSpinWell, #WK, #BattingOrder456, etc.
@@ -80,23 +117,11 @@ Based on Step c) - Assign Quality Tier:
 
 ADDITIONAL REQUIREMENT - Estimate Advanced Metrics (Phase-wise):
 Based on the player analysis from AuctionPrompt.md above, estimate phase-wise metrics:
-- **efscore** (Expected Runs vs Actual): 0-200, where 100 = average
-  * Powerplay: 100-150 for openers/PP specialists, 80-120 for others
-  * Middle Overs: 100-140 for middle-order/anchors, 80-120 for others
-  * Death: 100-160 for finishers/death specialists, 80-120 for others
-- **winp** (Win Probability Added): 0.0-1.0, where 0.5 = neutral
-  * Powerplay: 0.4-0.6 for specialists, 0.45-0.55 for others
-  * Middle Overs: 0.45-0.65 for key players, 0.45-0.55 for others
-  * Death: 0.5-0.7 for finishers, 0.45-0.55 for others
-- **raa** (Runs Above Average): Typically -20 to +30
-  * Powerplay: +5 to +15 for good openers, -5 to +5 for others
-  * Middle Overs: +5 to +20 for strong middle-order, -5 to +5 for others
-  * Death: +10 to +25 for finishers, -5 to +5 for others
-
+""" + _ADV_METRICS_SPEC + """
 Estimate based on: Tier A = higher metrics, Tier B = average, Role-specific strengths
 
 Respond in JSON format:
-{{
+{
   "primary_role": "Batter|BatAR|BowlAR|SpinBowler|FastBowler",
   "nationality_classification": "Indian|Foreigner",
   "batting_role": "Opener|MiddleOrder|Finisher",
@@ -113,12 +138,12 @@ Respond in JSON format:
   "quality": "A|B",
   "quality_tier": "A|B",
   "conditions_adaptability": 0.0-1.0,
-  "advanced_metrics": {{
-    "powerplay": {{"efscore": 100.0, "winp": 0.5, "raa": 0.0}},
-    "middle_overs": {{"efscore": 100.0, "winp": 0.5, "raa": 0.0}},
-    "death": {{"efscore": 100.0, "winp": 0.5, "raa": 0.0}}
-  }}
-}}
+  "advanced_metrics": {
+    "powerplay": {"efscore": 100.0, "winp": 0.5, "raa": 0.0},
+    "middle_overs": {"efscore": 100.0, "winp": 0.5, "raa": 0.0},
+    "death": {"efscore": 100.0, "winp": 0.5, "raa": 0.0}
+  }
+}
 
 IMPORTANT: 
 - Use the hashtag format (#TagName) for detailed_batting_tags and detailed_bowling_tags as shown in Step a) examples
@@ -128,166 +153,9 @@ IMPORTANT:
 - For batters: Higher metrics in their primary phase (opener→PP, finisher→death)
 - For bowlers: Higher metrics in their speciality phase (PP bowler→PP, death bowler→death)
 """
-        return prompt
-    
-    def parse_llm_response(self, response: str) -> Dict[str, Any]:
-        """Parse LLM response into structured data."""
-        # Try to extract JSON from response
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(0))
-            except:
-                pass
-        
-        # Fallback: try to parse as JSON directly
-        try:
-            return json.loads(response)
-        except:
-            return {}
-    
-    def tag_player(self, player: Player, stats_data: Optional[Dict[str, Any]] = None) -> Player:
-        """Tag a player using LLM."""
-        prompt = self.create_tagging_prompt(player, stats_data)
-        
-        try:
-            response = self.client.generate_content(prompt)
-            tags = self.parse_llm_response(response)
-            
-            # Apply tags to player
-            if tags.get('primary_role'):
-                try:
-                    player.primary_role = PrimaryRole(tags['primary_role'])
-                except:
-                    pass
-            
-            if tags.get('batting_role'):
-                try:
-                    player.batting_role = BattingRole(tags['batting_role'])
-                except:
-                    pass
-            
-            if tags.get('bowling_role'):
-                try:
-                    player.bowling_role = BowlingRole(tags['bowling_role'])
-                except:
-                    pass
-            
-            if tags.get('speciality'):
-                try:
-                    player.speciality = Speciality(tags['speciality'])
-                except:
-                    pass
-            
-            if tags.get('quality'):
-                try:
-                    player.quality = Quality(tags['quality'])
-                except:
-                    pass
-            
-            player.bat_utilization = tags.get('bat_utilization', [])
-            player.bowl_utilization = tags.get('bowl_utilization', [])
-            player.international_leagues = [tuple(x) for x in tags.get('international_leagues', [])]
-            player.ipl_experience = [tuple(x) for x in tags.get('ipl_experience', [])]
-            player.scouting = tags.get('scouting', [])
-            player.smat_performance = tags.get('smat_performance', [])
-            
-            # Store detailed hashtag-based tags from AuctionPrompt.md format
-            player.metadata['detailed_batting_tags'] = tags.get('detailed_batting_tags', [])
-            player.metadata['detailed_bowling_tags'] = tags.get('detailed_bowling_tags', [])
-            player.metadata['nationality_classification'] = tags.get('nationality_classification', player.country)
-            player.metadata['quality_tier'] = tags.get('quality_tier', tags.get('quality', 'B'))
-            
-            # Store conditions adaptability in metadata
-            player.metadata['conditions_adaptability'] = tags.get('conditions_adaptability', 0.5)
-            
-            # Set advanced metrics if provided
-            if 'advanced_metrics' in tags:
-                from models.player import PhaseMetrics
-                metrics = PhaseMetrics()
-                adv_metrics = tags['advanced_metrics']
-                
-                if 'powerplay' in adv_metrics:
-                    pp = adv_metrics['powerplay']
-                    metrics.powerplay = {
-                        'efscore': float(pp.get('efscore', 100.0)),
-                        'winp': float(pp.get('winp', 0.5)),
-                        'raa': float(pp.get('raa', 0.0))
-                    }
-                
-                if 'middle_overs' in adv_metrics:
-                    mo = adv_metrics['middle_overs']
-                    metrics.middle_overs = {
-                        'efscore': float(mo.get('efscore', 100.0)),
-                        'winp': float(mo.get('winp', 0.5)),
-                        'raa': float(mo.get('raa', 0.0))
-                    }
-                
-                if 'death' in adv_metrics:
-                    death = adv_metrics['death']
-                    metrics.death = {
-                        'efscore': float(death.get('efscore', 100.0)),
-                        'winp': float(death.get('winp', 0.5)),
-                        'raa': float(death.get('raa', 0.0))
-                    }
-                
-                player.advanced_metrics = metrics
-        
-        except Exception as e:
-            print(f"Error tagging player {player.name}: {e}")
-        
-        return player
-    
-    def create_batch_tagging_prompt(self, players: List[Player], stats_data_dict: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
-        """Create a single prompt for tagging multiple players (up to 10)."""
-        if not hasattr(self, 'prompt_loader'):
-            self.prompt_loader = PromptLoader()
-        
-        # Load system context from AuctionPrompt.md
-        system_context = self.prompt_loader.get_tagging_context()
-        
-        # Build player data section
-        players_data = []
-        for i, player in enumerate(players, 1):
-            player_info = f"""
-Player {i}: {player.name}
-- Country: {player.country}
-- Batting Hand: {player.batting_hand or 'Unknown'}
-- Bowling Style: {player.bowling_style or 'N/A'}
-- Base Price: {player.base_price}L"""
-            
-            # Add advanced metrics if available
-            if player.advanced_metrics:
-                pp = player.advanced_metrics.powerplay or {}
-                mo = player.advanced_metrics.middle_overs or {}
-                death = player.advanced_metrics.death or {}
-                player_info += f"""
-- Advanced Metrics:
-  * Powerplay: efscore={pp.get('efscore', 'N/A')}, winp={pp.get('winp', 'N/A')}, raa={pp.get('raa', 'N/A')}
-  * Middle Overs: efscore={mo.get('efscore', 'N/A')}, winp={mo.get('winp', 'N/A')}, raa={mo.get('raa', 'N/A')}
-  * Death: efscore={death.get('efscore', 'N/A')}, winp={death.get('winp', 'N/A')}, raa={death.get('raa', 'N/A')}"""
-            
-            # Add conditions performance if available
-            if player.performance_by_conditions:
-                player_info += f"\n- Performance by conditions: {json.dumps(player.performance_by_conditions)}"
-            
-            # Add additional stats if available
-            if stats_data_dict and player.name in stats_data_dict:
-                player_info += f"\n- Additional Stats: {json.dumps(stats_data_dict[player.name])}"
-            
-            players_data.append(player_info)
-        
-        players_section = "\n".join(players_data)
-        
-        prompt = f"""{system_context}
 
-=== BATCH PLAYER ANALYSIS TASK ===
-
-Using the instructions from AuctionPrompt.md above, analyze the following {len(players)} cricket players and assign comprehensive tags following Step a), b), and c).
-
-{players_section}
-
-=== ASSIGNMENT REQUIREMENTS ===
+# Static tail of the batch tagging prompt; only the player count varies
+_BATCH_TAGGING_REQUIREMENTS = """=== ASSIGNMENT REQUIREMENTS ===
 
 For EACH player, follow these steps:
 
@@ -307,19 +175,7 @@ Step c) - Assign Quality Tier:
 
 ADDITIONAL REQUIREMENT - Estimate Advanced Metrics (Phase-wise):
 For each player, based on the analysis from AuctionPrompt.md above, estimate phase-wise metrics:
-- **efscore** (Expected Runs vs Actual): Score 0-200, where 100 = average performance
-  * Powerplay: For openers/PP specialists, typically 100-150. For others, 80-120
-  * Middle Overs: For middle-order/anchors, typically 100-140. For others, 80-120
-  * Death: For finishers/death specialists, typically 100-160. For others, 80-120
-- **winp** (Win Probability Added): Score 0.0-1.0, where 0.5 = neutral
-  * Powerplay: 0.4-0.6 for specialists, 0.45-0.55 for others
-  * Middle Overs: 0.45-0.65 for key players, 0.45-0.55 for others
-  * Death: 0.5-0.7 for finishers, 0.45-0.55 for others
-- **raa** (Runs Above Average): Score -20 to +30 typically
-  * Powerplay: +5 to +15 for good openers, -5 to +5 for others
-  * Middle Overs: +5 to +20 for strong middle-order, -5 to +5 for others
-  * Death: +10 to +25 for finishers, -5 to +5 for others
-
+""" + _ADV_METRICS_SPEC + """
 Estimate based on:
 - Tier A players: Higher metrics (efscore 110-150, winp 0.55-0.7, raa +10 to +25)
 - Tier B players: Average to below average (efscore 80-110, winp 0.45-0.55, raa -5 to +10)
@@ -378,153 +234,317 @@ Respond in JSON format with an array of player tags:
 }}
 
 IMPORTANT: 
-- Return tags for ALL {len(players)} players in the response
+- Return tags for ALL {player_count} players in the response
 - Use the hashtag format (#TagName) for detailed_batting_tags and detailed_bowling_tags
 - Ensure speciality classification follows Step b) criteria exactly
 - Quality tier must follow Step c) criteria strictly
 """
-        return prompt
+
+
+def _prompt_json(value: Any) -> str:
+    """Serialize data for a prompt compactly (indentation only costs input tokens)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
+def _phase_metric_values(phase: Optional[Dict[str, Any]]) -> tuple:
+    """Unpack (efscore, winp, raa) from a phase-metrics dict, 'N/A' for missing values."""
+    if not phase:
+        return 'N/A', 'N/A', 'N/A'
+    return phase.get('efscore', 'N/A'), phase.get('winp', 'N/A'), phase.get('raa', 'N/A')
+
+
+class PlayerTagger:
+    """Tag players using LLM analysis."""
     
-    def parse_batch_llm_response(self, response: str) -> Dict[str, Dict[str, Any]]:
-        """Parse LLM batch response into dictionary mapping player names to tags."""
-        import re
-        # Try to extract JSON from response
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
+    # Most players one batch prompt may carry; each gets a full tag/metrics object back
+    MAX_BATCH_SIZE = 10
+    
+    def __init__(self, gemini_client: GeminiClient, executor: Optional[Executor] = None):
+        """Initialize tagger (executor: shared pool for per-player fallback calls)."""
+        self.client = gemini_client
+        self.executor = executor
+        self.prompt_loader = get_default_loader()
+        self._system_context: Optional[str] = None
+    
+    def get_system_context(self) -> str:
+        """Get the tagging context from AuctionPrompt.md (built once per tagger)."""
+        if self._system_context is None:
+            self._system_context = self.prompt_loader.get_tagging_context()
+        return self._system_context
+    
+    def create_tagging_prompt(self, player: Player, stats_data: Optional[Dict[str, Any]] = None) -> str:
+        """Create prompt for LLM player tagging using AuctionPrompt.md."""
+        # Load system context from AuctionPrompt.md
+        system_context = self.get_system_context()
+        
+        # Build advanced metrics string
+        metrics_str = "N/A"
+        advanced_metrics = player.advanced_metrics
+        if advanced_metrics:
+            pp_ef, pp_wp, pp_raa = _phase_metric_values(advanced_metrics.powerplay)
+            mo_ef, mo_wp, mo_raa = _phase_metric_values(advanced_metrics.middle_overs)
+            de_ef, de_wp, de_raa = _phase_metric_values(advanced_metrics.death)
+            metrics_str = f"""
+Advanced Metrics:
+- Powerplay: efscore={pp_ef}, winp={pp_wp}, raa={pp_raa}
+- Middle Overs: efscore={mo_ef}, winp={mo_wp}, raa={mo_raa}
+- Death: efscore={de_ef}, winp={de_wp}, raa={de_raa}
+"""
+        
+        # Build conditions performance string
+        conditions_str = "N/A"
+        if player.performance_by_conditions:
+            conditions_str = f"Performance by conditions: {_prompt_json(player.performance_by_conditions)}"
+        
+        # Build stats string
+        stats_str = ""
+        if stats_data:
+            stats_str = f"\nAdditional Stats: {_prompt_json(stats_data)}"
+        
+        return _TAGGING_TEMPLATE.format_map({
+            'system_context': system_context,
+            'name': player.name,
+            'country': player.country,
+            'batting_hand': player.batting_hand or 'Unknown',
+            'bowling_style': player.bowling_style or 'N/A',
+            'base_price': player.base_price,
+            'metrics_str': metrics_str,
+            'conditions_str': conditions_str,
+            'stats_str': stats_str,
+            'requirements': _TAGGING_REQUIREMENTS,
+        })
+    
+    def _load_response_json(self, response: str) -> Any:
+        """Decode the first JSON object in an LLM response, or None if there is none."""
+        # JSON mode responses are a bare JSON document
+        try:
+            return orjson.loads(response)
+        except orjson.JSONDecodeError:
+            pass
+        
+        # Fallback: extract JSON wrapped in prose or code fences (older cached responses)
+        json_span = extract_json_span(response)
+        if json_span is not None:
             try:
-                data = json.loads(json_match.group(0))
-                # Convert array to dictionary
-                result = {}
-                if 'players' in data:
-                    for player_data in data['players']:
-                        player_name = player_data.get('player_name', '')
-                        if player_name:
-                            result[player_name] = player_data
-                return result
-            except:
+                return orjson.loads(json_span)
+            except orjson.JSONDecodeError:
                 pass
+        return None
+    
+    def parse_llm_response(self, response: str) -> Dict[str, Any]:
+        """Parse LLM response into structured data."""
+        data = self._load_response_json(response)
+        return data if isinstance(data, dict) else {}
+    
+    def tag_player(self, player: Player, stats_data: Optional[Dict[str, Any]] = None, use_cache: bool = True) -> Player:
+        """Tag a player using LLM (responses come from the client's on-disk cache when use_cache is set)."""
+        prompt = self.create_tagging_prompt(player, stats_data)
         
-        # Fallback: try to parse as JSON directly
         try:
-            data = json.loads(response)
-            result = {}
-            if 'players' in data:
-                for player_data in data['players']:
-                    player_name = player_data.get('player_name', '')
-                    if player_name:
-                        result[player_name] = player_data
-            return result
-        except:
+            response = self.client.generate_content(prompt, use_cache=use_cache, generation_config=_JSON_GENERATION_CONFIG)
+            self._apply_tag_response(player, response)
+        except Exception as e:
+            print(f"Error tagging player {player.name}: {e}")
+        
+        return player
+    
+    def _apply_tag_response(self, player: Player, response: str):
+        """Parse a single-player tagging response and apply the tags to the player."""
+        tags = self.parse_llm_response(response)
+        self._apply_tags(player, tags)
+    
+    def _apply_tags(self, player: Player, tags: Dict[str, Any]):
+        """Apply parsed LLM tags to a player."""
+        for attr, members in _ENUM_TAGS:
+            value = tags.get(attr)
+            if isinstance(value, str) and value in members:
+                setattr(player, attr, members[value])
+        
+        player.bat_utilization = tags.get('bat_utilization', [])
+        player.bowl_utilization = tags.get('bowl_utilization', [])
+        player.international_leagues = list(map(tuple, tags.get('international_leagues') or ()))
+        player.ipl_experience = list(map(tuple, tags.get('ipl_experience') or ()))
+        player.scouting = tags.get('scouting', [])
+        player.smat_performance = tags.get('smat_performance', [])
+        
+        # Store detailed hashtag-based tags from AuctionPrompt.md format
+        player.metadata['detailed_batting_tags'] = tags.get('detailed_batting_tags', [])
+        player.metadata['detailed_bowling_tags'] = tags.get('detailed_bowling_tags', [])
+        player.metadata['nationality_classification'] = tags.get('nationality_classification', player.country)
+        player.metadata['quality_tier'] = tags.get('quality_tier', tags.get('quality', 'B'))
+        
+        # Store conditions adaptability in metadata
+        player.metadata['conditions_adaptability'] = tags.get('conditions_adaptability', 0.5)
+        
+        # Set advanced metrics if provided
+        if 'advanced_metrics' in tags:
+            metrics = PhaseMetrics()
+            adv_metrics = tags['advanced_metrics']
+            
+            for phase in _METRIC_PHASES:
+                if phase in adv_metrics:
+                    phase_tags = adv_metrics[phase]
+                    setattr(metrics, phase, {
+                        'efscore': float(phase_tags.get('efscore', 100.0)),
+                        'winp': float(phase_tags.get('winp', 0.5)),
+                        'raa': float(phase_tags.get('raa', 0.0))
+                    })
+            
+            player.advanced_metrics = metrics
+    
+    def create_batch_tagging_prompt(self, players: List[Player], stats_data_dict: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """Create a single prompt for tagging multiple players (up to 10)."""
+        # Load system context from AuctionPrompt.md
+        system_context = self.get_system_context()
+        batch_requirements = _BATCH_TAGGING_REQUIREMENTS.format(player_count=len(players))
+        
+        # Build player data section as one flat list of fragments
+        parts = []
+        for i, player in enumerate(players, 1):
+            if i > 1:
+                parts.append("\n")
+            parts.append(f"""
+Player {i}: {player.name}
+- Country: {player.country}
+- Batting Hand: {player.batting_hand or 'Unknown'}
+- Bowling Style: {player.bowling_style or 'N/A'}
+- Base Price: {player.base_price}L""")
+            
+            # Add advanced metrics if available
+            advanced_metrics = player.advanced_metrics
+            if advanced_metrics:
+                pp_ef, pp_wp, pp_raa = _phase_metric_values(advanced_metrics.powerplay)
+                mo_ef, mo_wp, mo_raa = _phase_metric_values(advanced_metrics.middle_overs)
+                de_ef, de_wp, de_raa = _phase_metric_values(advanced_metrics.death)
+                parts.append(f"""
+- Advanced Metrics:
+  * Powerplay: efscore={pp_ef}, winp={pp_wp}, raa={pp_raa}
+  * Middle Overs: efscore={mo_ef}, winp={mo_wp}, raa={mo_raa}
+  * Death: efscore={de_ef}, winp={de_wp}, raa={de_raa}""")
+            
+            # Add conditions performance if available
+            if player.performance_by_conditions:
+                parts.append("\n- Performance by conditions: ")
+                parts.append(_prompt_json(player.performance_by_conditions))
+            
+            # Add additional stats if available
+            if stats_data_dict and player.name in stats_data_dict:
+                parts.append("\n- Additional Stats: ")
+                parts.append(_prompt_json(stats_data_dict[player.name]))
+        
+        players_section = "".join(parts)
+        
+        return _BATCH_TAGGING_TEMPLATE.format_map({
+            'system_context': system_context,
+            'player_count': len(players),
+            'players_section': players_section,
+            'requirements': batch_requirements,
+        })
+    
+    def parse_batch_llm_response(self, response: str) -> Dict[str, Dict[str, Any]]:
+        """Parse LLM batch response into dictionary mapping player names to tags."""
+        data = self._load_response_json(response)
+        if not isinstance(data, dict):
             return {}
+        
+        # Convert array to dictionary
+        result = {}
+        for player_data in data.get('players') or []:
+            if not isinstance(player_data, dict):
+                continue
+            player_name = player_data.get('player_name', '')
+            if player_name:
+                result[player_name] = player_data
+        return result
+    
+    def tag_all(
+        self,
+        players: List[Player],
+        shard_size: int = 10,
+        workers: int = 8,
+        stats_data_dict: Optional[Dict[str, Dict[str, Any]]] = None,
+        use_cache: bool = True
+    ) -> List[Player]:
+        """Tag any number of players in batch-sized shards, running up to `workers` shards at once."""
+        if shard_size > self.MAX_BATCH_SIZE:
+            raise ValueError(f"Shard size cannot exceed {self.MAX_BATCH_SIZE} players")
+        
+        shards = [players[i:i + shard_size] for i in range(0, len(players), shard_size)]
+        if not shards:
+            return []
+        
+        # executor.map yields shard results in input order
+        with ThreadPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            results = executor.map(
+                lambda shard: self.tag_players_batch(shard, stats_data_dict, use_cache),
+                shards
+            )
+            return [player for shard_result in results for player in shard_result]
     
-    def tag_players_batch(self, players: List[Player], stats_data_dict: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Player]:
+    def _generate_batch_response(self, prompt: str, use_cache: bool) -> str:
+        """Make the batch LLM call, retrying transient API errors with backoff."""
+        for attempt in range(_BATCH_RETRY_ATTEMPTS):
+            try:
+                return self.client.generate_content(prompt, use_cache=use_cache, generation_config=_JSON_GENERATION_CONFIG)
+            except _TRANSIENT_ERRORS as e:
+                if attempt == _BATCH_RETRY_ATTEMPTS - 1:
+                    raise
+                delay = min(_BATCH_RETRY_MAX_DELAY, _BATCH_RETRY_BASE_DELAY * 2 ** attempt)
+                delay = random.uniform(delay / 2, delay)
+                print(f"Transient error in batch tagging ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def tag_players_batch(
+        self,
+        players: List[Player],
+        stats_data_dict: Optional[Dict[str, Dict[str, Any]]] = None,
+        use_cache: bool = True
+    ) -> List[Player]:
         """Tag multiple players in a single LLM call (batch of up to 10)."""
-        if len(players) > 10:
-            raise ValueError("Batch size cannot exceed 10 players")
+        if len(players) > self.MAX_BATCH_SIZE:
+            raise ValueError(f"Batch size cannot exceed {self.MAX_BATCH_SIZE} players")
+        
+        # Create batch prompt; players are listed in name order so the same set
+        # always renders the same prompt and re-runs hit the response cache
+        prompt = self.create_batch_tagging_prompt(sorted(players, key=lambda p: p.name), stats_data_dict)
         
-        # Create batch prompt
-        prompt = self.create_batch_tagging_prompt(players, stats_data_dict)
+        # Oversized prompts fail (or get truncated) and would drop every player to
+        # the one-by-one fallback; split the batch in half up front instead
+        if len(players) > 1 and len(prompt) // _CHARS_PER_TOKEN > _MAX_BATCH_PROMPT_TOKENS:
+            mid = len(players) // 2
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                halves = executor.map(
+                    lambda half: self.tag_players_batch(half, stats_data_dict, use_cache),
+                    (players[:mid], players[mid:])
+                )
+                return [player for half in halves for player in half]
         
         try:
             # Single LLM call for all players
-            response = self.client.generate_content(prompt)
+            response = self._generate_batch_response(prompt, use_cache)
             tags_dict = self.parse_batch_llm_response(response)
             
             # Apply tags to each player
             tagged_players = []
             for player in players:
-                player_tags = tags_dict.get(player.name, {})
-                
-                # Apply tags to player (same logic as tag_player)
-                if player_tags.get('primary_role'):
-                    try:
-                        player.primary_role = PrimaryRole(player_tags['primary_role'])
-                    except:
-                        pass
-                
-                if player_tags.get('batting_role'):
-                    try:
-                        player.batting_role = BattingRole(player_tags['batting_role'])
-                    except:
-                        pass
-                
-                if player_tags.get('bowling_role'):
-                    try:
-                        player.bowling_role = BowlingRole(player_tags['bowling_role'])
-                    except:
-                        pass
-                
-                if player_tags.get('speciality'):
-                    try:
-                        player.speciality = Speciality(player_tags['speciality'])
-                    except:
-                        pass
-                
-                if player_tags.get('quality'):
-                    try:
-                        player.quality = Quality(player_tags['quality'])
-                    except:
-                        pass
-                
-                player.bat_utilization = player_tags.get('bat_utilization', [])
-                player.bowl_utilization = player_tags.get('bowl_utilization', [])
-                player.international_leagues = [tuple(x) for x in player_tags.get('international_leagues', [])]
-                player.ipl_experience = [tuple(x) for x in player_tags.get('ipl_experience', [])]
-                player.scouting = player_tags.get('scouting', [])
-                player.smat_performance = player_tags.get('smat_performance', [])
-                
-                # Store detailed hashtag-based tags
-                player.metadata['detailed_batting_tags'] = player_tags.get('detailed_batting_tags', [])
-                player.metadata['detailed_bowling_tags'] = player_tags.get('detailed_bowling_tags', [])
-                player.metadata['nationality_classification'] = player_tags.get('nationality_classification', player.country)
-                player.metadata['quality_tier'] = player_tags.get('quality_tier', player_tags.get('quality', 'B'))
-                player.metadata['conditions_adaptability'] = player_tags.get('conditions_adaptability', 0.5)
-                
-                # Set advanced metrics if provided
-                if 'advanced_metrics' in player_tags:
-                    from models.player import PhaseMetrics
-                    metrics = PhaseMetrics()
-                    adv_metrics = player_tags['advanced_metrics']
-                    
-                    if 'powerplay' in adv_metrics:
-                        pp = adv_metrics['powerplay']
-                        metrics.powerplay = {
-                            'efscore': float(pp.get('efscore', 100.0)),
-                            'winp': float(pp.get('winp', 0.5)),
-                            'raa': float(pp.get('raa', 0.0))
-                        }
-                    
-                    if 'middle_overs' in adv_metrics:
-                        mo = adv_metrics['middle_overs']
-                        metrics.middle_overs = {
-                            'efscore': float(mo.get('efscore', 100.0)),
-                            'winp': float(mo.get('winp', 0.5)),
-                            'raa': float(mo.get('raa', 0.0))
-                        }
-                    
-                    if 'death' in adv_metrics:
-                        death = adv_metrics['death']
-                        metrics.death = {
-                            'efscore': float(death.get('efscore', 100.0)),
-                            'winp': float(death.get('winp', 0.5)),
-                            'raa': float(death.get('raa', 0.0))
-                        }
-                    
-                    player.advanced_metrics = metrics
-                
+                self._apply_tags(player, tags_dict.get(player.name, {}))
                 tagged_players.append(player)
             
             return tagged_players
             
         except Exception as e:
             print(f"Error in batch tagging: {e}")
-            # Fallback to individual tagging if batch fails
-            tagged = []
-            for player in players:
-                try:
-                    tagged_player = self.tag_player(player, stats_data_dict.get(player.name) if stats_data_dict else None)
-                    tagged.append(tagged_player)
-                except:
-                    tagged.append(player)  # Return untagged player if tagging fails
-            return tagged
+            # Fallback to individual tagging if batch fails, still in parallel on
+            # threads (so this also works when called from inside a running event
+            # loop); tag_player returns the player untagged if its own call fails.
+            stats_lookup = stats_data_dict or {}
+            
+            def tag_one(player: Player) -> Player:
+                return self.tag_player(player, stats_lookup.get(player.name), use_cache)
+            
+            # These are leaf calls (tag_player never submits work), so the shared pool is safe here
+            if self.executor is not None:
+                return list(self.executor.map(tag_one, players))
+            with ThreadPoolExecutor(max_workers=min(10, len(players)) or 1) as executor:
+                return list(executor.map(tag_one, players))
 
@@ -1,97 +1,42 @@
 """LLM-based team matcher with bias awareness and advanced metrics."""
 
+from operator import itemgetter
 from typing import Dict, Any, Optional, List, Tuple
 from models.player import Player
 from models.team import Team
 from llm.gemini_client import GeminiClient
-from llm.prompt_loader import PromptLoader
+from llm.prompt_loader import get_default_loader
 from core.bias_modeler import BiasModeler
 from core.team_requirements import TeamRequirementsGenerator
 from core.player_profile import PlayerProfileGenerator
+from utils import extract_json_span
 import json
-import re
+import orjson
 
 
-class TeamMatcher:
-    """Match players to teams using LLM reasoning."""
-    
-    def __init__(self, gemini_client: GeminiClient, bias_modeler: BiasModeler):
-        """Initialize matcher."""
-        self.client = gemini_client
-        self.bias_modeler = bias_modeler
-        self.requirements_generator = TeamRequirementsGenerator()
-        self.profile_generator = PlayerProfileGenerator()
-        self.prompt_loader = PromptLoader()
-    
-    def create_matching_prompt(
-        self,
-        player: Player,
-        team: Team,
-        requirements: Dict[str, Any],
-        bias_context: str
-    ) -> str:
-        """Create prompt for LLM team matching."""
-        player_profile = self.profile_generator.generate_profile(player)
-        
-        # Format advanced metrics
-        metrics_str = "N/A"
-        if player_profile.get('advanced_metrics'):
-            am = player_profile['advanced_metrics']
-            metrics_str = f"""
-Powerplay: efscore={am['powerplay'].get('efscore', 'N/A')}, winp={am['powerplay'].get('winp', 'N/A')}, raa={am['powerplay'].get('raa', 'N/A')}
-Middle Overs: efscore={am['middle_overs'].get('efscore', 'N/A')}, winp={am['middle_overs'].get('winp', 'N/A')}, raa={am['middle_overs'].get('raa', 'N/A')}
-Death: efscore={am['death'].get('efscore', 'N/A')}, winp={am['death'].get('winp', 'N/A')}, raa={am['death'].get('raa', 'N/A')}
-"""
-        
-        # Format conditions performance
-        conditions_str = f"Balance Score: {player_profile.get('conditions_balance_score', 0):.2f}, Adaptability: {player_profile.get('conditions_adaptability', 0):.2f}"
-        
-        # Format requirements
-        req_str = "\n".join([
-            f"- {r['role']} ({r['urgency']}): {r['reason']}"
-            for r in requirements.get('requirements', [])[:5]  # Top 5 requirements
-        ])
-        
-        # Format retained players
-        retained_str = ", ".join([p.name for p in team.retained_players[:10]])  # First 10
-        
-        # Load system context from AuctionPrompt.md
-        system_context = self.prompt_loader.get_matching_context()
-        
-        # Get player's detailed tags if available
-        player_tags = ""
-        if hasattr(player, 'metadata'):
-            detailed_batting = player.metadata.get('detailed_batting_tags', [])
-            detailed_bowling = player.metadata.get('detailed_bowling_tags', [])
-            if detailed_batting or detailed_bowling:
-                player_tags = f"""
-Player Tags:
-- Batting: {', '.join(detailed_batting) if detailed_batting else 'N/A'}
-- Bowling: {', '.join(detailed_bowling) if detailed_bowling else 'N/A'}
-"""
-        
-        prompt = f"""{system_context}
+# Matching prompt; filled with format_map so only the per-team fields are formatted per call
+_MATCHING_TEMPLATE = """{system_context}
 
 === TEAM-PLAYER MATCHING TASK ===
 
 **CRITICAL**: This player IS AVAILABLE in the auction supply. Only evaluate THIS SPECIFIC PLAYER for THIS TEAM.
-Do NOT suggest any other players. Focus on assessing {player.name}'s fit for {team.name}'s requirements.
+Do NOT suggest any other players. Focus on assessing {player_name}'s fit for {team_name}'s requirements.
 
 Follow Step f) framework from the instructions above to compute demand score and price ranges.
 
-Player: {player.name}
-Profile: {json.dumps(player_profile, indent=2)}
+Player: {player_name}
+Profile: {profile_json}
 {player_tags}
 Advanced Metrics:
 {metrics_str}
 
 Conditions Performance: {conditions_str}
 
-Team: {team.name}
-Home Ground: {team.home_ground} ({team.ground_condition})
-Purse Available: {team.purse_available}L ({team.purse_available/100:.2f} Cr)
-Available Slots: {team.available_slots}
-Available Foreign Slots: {team.available_foreign_slots}
+Team: {team_name}
+Home Ground: {home_ground} ({ground_condition})
+Purse Available: {purse_available}L ({purse_crores:.2f} Cr)
+Available Slots: {available_slots}
+Available Foreign Slots: {available_foreign_slots}
 
 Team Requirements:
 {req_str}
@@ -138,47 +83,182 @@ Respond in JSON format following Step f) output format:
 }}
 
 Format the output similar to Step f) example:
-Player Name: {player.name}
-Tags: {', '.join(detailed_batting[:3]) if detailed_batting else 'N/A'}, {', '.join(detailed_bowling[:3]) if detailed_bowling else 'N/A'}
+Player Name: {player_name}
+Tags: {tag_summary}
 Speciality: [from player profile]
 Quality Tier: [A or B]
-{team.name} – Demand [X]/10 | Fair: [X-Y]Cr | All-out: [X-Y]Cr | Fills: [specific gaps]
+{team_name} – Demand [X]/10 | Fair: [X-Y]Cr | All-out: [X-Y]Cr | Fills: [specific gaps]
+"""
+
+
+class TeamMatcher:
+    """Match players to teams using LLM reasoning."""
+    
+    def __init__(self, gemini_client: GeminiClient, bias_modeler: BiasModeler):
+        """Initialize matcher."""
+        self.client = gemini_client
+        self.bias_modeler = bias_modeler
+        self.requirements_generator = TeamRequirementsGenerator()
+        self.profile_generator = PlayerProfileGenerator()
+        self.prompt_loader = get_default_loader()
+        # team name -> (squad fingerprint, requirements); one entry per team, replaced when the squad changes
+        self._requirements_cache: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {}
+    
+    def get_requirements(self, team: Team) -> Dict[str, Any]:
+        """Get team requirements, recomputed only after the team's squad or purse changes."""
+        # Keyed on the squad's names, not its size: an undo followed by a different sale
+        # (or an imported state) can swap players without changing counts or purse
+        fingerprint = (
+            id(team),
+            tuple(p.name for p in team.retained_players),
+            tuple(p.name for p in team.bought_players),
+            team.purse_available
+        )
+        cached = self._requirements_cache.get(team.name)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        
+        requirements = self.requirements_generator.generate_requirements(team)
+        self._requirements_cache[team.name] = (fingerprint, requirements)
+        return requirements
+    
+    def build_player_context(self, player: Player) -> Dict[str, str]:
+        """Build the team-independent parts of the matching prompt for a player."""
+        player_profile = self.profile_generator.generate_profile(player)
+        
+        # Format advanced metrics
+        metrics_str = "N/A"
+        if player_profile.get('advanced_metrics'):
+            am = player_profile['advanced_metrics']
+            metrics_str = f"""
+Powerplay: efscore={am['powerplay'].get('efscore', 'N/A')}, winp={am['powerplay'].get('winp', 'N/A')}, raa={am['powerplay'].get('raa', 'N/A')}
+Middle Overs: efscore={am['middle_overs'].get('efscore', 'N/A')}, winp={am['middle_overs'].get('winp', 'N/A')}, raa={am['middle_overs'].get('raa', 'N/A')}
+Death: efscore={am['death'].get('efscore', 'N/A')}, winp={am['death'].get('winp', 'N/A')}, raa={am['death'].get('raa', 'N/A')}
+"""
+        
+        # Format conditions performance
+        conditions_str = f"Balance Score: {player_profile.get('conditions_balance_score', 0):.2f}, Adaptability: {player_profile.get('conditions_adaptability', 0):.2f}"
+        
+        # Get player's detailed tags if available (Player.metadata always exists)
+        player_tags = ""
+        detailed_batting = player.metadata.get('detailed_batting_tags', [])
+        detailed_bowling = player.metadata.get('detailed_bowling_tags', [])
+        if detailed_batting or detailed_bowling:
+            player_tags = f"""
+Player Tags:
+- Batting: {', '.join(detailed_batting) if detailed_batting else 'N/A'}
+- Bowling: {', '.join(detailed_bowling) if detailed_bowling else 'N/A'}
 """
-        return prompt
+        
+        return {
+            'player_name': player.name,
+            'profile_json': orjson.dumps(player_profile).decode('utf-8'),
+            'player_tags': player_tags,
+            'metrics_str': metrics_str,
+            'conditions_str': conditions_str,
+            'tag_summary': f"{', '.join(detailed_batting[:3]) if detailed_batting else 'N/A'}, {', '.join(detailed_bowling[:3]) if detailed_bowling else 'N/A'}",
+        }
+    
+    def create_matching_prompt(
+        self,
+        player: Player,
+        team: Team,
+        requirements: Dict[str, Any],
+        bias_context: str,
+        player_context: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Create prompt for LLM team matching."""
+        if player_context is None:
+            player_context = self.build_player_context(player)
+        
+        # Format requirements
+        req_str = "\n".join([
+            f"- {r['role']} ({r['urgency']}): {r['reason']}"
+            for r in requirements.get('requirements', [])[:5]  # Top 5 requirements
+        ])
+        
+        # Format retained players
+        retained_str = ", ".join([p.name for p in team.retained_players[:10]])  # First 10
+        
+        return _MATCHING_TEMPLATE.format_map({
+            **player_context,
+            # Load system context from AuctionPrompt.md
+            'system_context': self.prompt_loader.get_matching_context(),
+            'team_name': team.name,
+            'home_ground': team.home_ground,
+            'ground_condition': team.ground_condition,
+            'purse_available': team.purse_available,
+            'purse_crores': team.purse_available / 100,
+            'available_slots': team.available_slots,
+            'available_foreign_slots': team.available_foreign_slots,
+            'req_str': req_str,
+            'retained_str': retained_str,
+            'bias_context': bias_context,
+        })
     
     def parse_llm_response(self, response: str) -> Dict[str, Any]:
         """Parse LLM response into structured data."""
-        # Try to extract JSON
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(0))
-            except:
-                pass
+        # Error strings and plain-text replies carry no JSON object at all
+        if '{' not in response:
+            return {}
         
-        # Fallback
+        # Common case: the model returned bare JSON
         try:
             return json.loads(response)
-        except:
-            return {}
+        except ValueError:
+            pass
+        
+        # Otherwise pull the first balanced {...} out of the surrounding text
+        span = extract_json_span(response)
+        if span is not None:
+            try:
+                return json.loads(span)
+            except ValueError:
+                pass
+        
+        return {}
     
-    def match_player_to_team(
+    def _error_result(self, player: Player, team: Team, error: str) -> Dict[str, Any]:
+        """Zero-demand result for a match that could not be evaluated."""
+        return {
+            'player_name': player.name,
+            'team_name': team.name,
+            'overall_demand_score': 0,
+            'error': error
+        }
+    
+    def _impossible_match_reason(self, player: Player, team: Team) -> Optional[str]:
+        """Reason the team cannot sign the player at all (no slot, no overseas slot, purse below base), else None."""
+        if team.available_slots <= 0:
+            return f"{team.name} has no squad slots left"
+        if player.country != "Indian" and team.available_foreign_slots <= 0:
+            return f"{team.name} has no overseas slots left"
+        if team.purse_available < player.base_price:
+            return f"{team.name} purse ({team.purse_available}L) is below base price ({player.base_price}L)"
+        return None
+    
+    def _impossible_result(self, player: Player, team: Team, reason: str) -> Dict[str, Any]:
+        """Zero-demand result for a pair rejected without an LLM call."""
+        return {
+            'player_name': player.name,
+            'team_name': team.name,
+            'overall_demand_score': 0,
+            'base_demand_score': 0,
+            'bias_score': 0.0,
+            'bias_boost': 0.0,
+            'gaps_filled': [],
+            'demand_reasoning': reason
+        }
+    
+    def _prepare_match(
         self,
         player: Player,
-        team: Team
-    ) -> Dict[str, Any]:
-        """Match a player to a team using LLM."""
-        if not self.client:
-            print(f"[TEAM_MATCHER] ERROR: Gemini client is None for {player.name} -> {team.name}")
-            return {
-                'player_name': player.name,
-                'team_name': team.name,
-                'overall_demand_score': 0,
-                'error': 'Gemini client not initialized'
-            }
-        
+        team: Team,
+        player_context: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, Dict[str, Any], float, str]:
+        """Build the matching prompt for a player/team pair; returns (prompt, requirements, bias_score, bias_reason)."""
         # Get requirements
-        requirements = self.requirements_generator.generate_requirements(team)
+        requirements = self.get_requirements(team)
         
         # Get bias info from BiasModeler (raw numeric score + reason). Do not apply hardcoded boosts here;
         # include bias context for the LLM to use when computing demand.
@@ -190,59 +270,111 @@ Quality Tier: [A or B]
         bias_context = f"Bias Score: {bias_score:.3f}. Bias Reason: {bias_reason}" if bias_reason or bias_score else ""
         
         # Create prompt
-        prompt = self.create_matching_prompt(player, team, requirements, bias_context)
+        prompt = self.create_matching_prompt(player, team, requirements, bias_context, player_context)
+        return prompt, requirements, bias_score, bias_reason
+    
+    def _build_match_result(
+        self,
+        player: Player,
+        team: Team,
+        response: str,
+        requirements: Dict[str, Any],
+        bias_score: float,
+        bias_reason: str
+    ) -> Dict[str, Any]:
+        """Turn an LLM response into a match result annotated with bias and requirements."""
+        match_result = self.parse_llm_response(response)
+        
+        if not match_result:
+            print(f"[TEAM_MATCHER] WARNING: Empty match result for {player.name} -> {team.name}")
+            match_result = {}
+        
+        # Record bias info returned by BiasModeler; do NOT apply a fixed multiplier boost here.
+        # Every result carries overall_demand_score so callers can sort with itemgetter
+        base_demand = match_result.setdefault('overall_demand_score', 0)
+        match_result['base_demand_score'] = base_demand
+        match_result['bias_score'] = bias_score
+        match_result['bias_reason'] = bias_reason
+        # Provide a numeric 'bias_boost' field equal to the bias score so downstream formatters
+        # can choose how to present it (no hardcoded adjustment here).
+        match_result['bias_boost'] = bias_score
+        
+        # Add metadata
+        match_result['player_name'] = player.name
+        match_result['team_name'] = team.name
+        match_result['requirements'] = requirements
+        
+        # Add new fields from AuctionPrompt.md format
+        match_result['release_history_factor'] = match_result.get('release_history_factor', 5.0)
+        match_result['synergy_factor'] = match_result.get('synergy_factor', 5.0)
+        match_result['demand_reasoning'] = match_result.get('demand_reasoning', '')
+        
+        return match_result
+    
+    def match_player_to_team(
+        self,
+        player: Player,
+        team: Team,
+        player_context: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Match a player to a team using LLM."""
+        if not self.client:
+            print(f"[TEAM_MATCHER] ERROR: Gemini client is None for {player.name} -> {team.name}")
+            return self._error_result(player, team, 'Gemini client not initialized')
+        
+        reason = self._impossible_match_reason(player, team)
+        if reason:
+            return self._impossible_result(player, team, reason)
+        
+        prompt, requirements, bias_score, bias_reason = self._prepare_match(player, team, player_context)
         
         try:
             response = self.client.generate_content(prompt)
-            match_result = self.parse_llm_response(response)
-            
-            if not match_result:
-                print(f"[TEAM_MATCHER] WARNING: Empty match result for {player.name} -> {team.name}")
-                match_result = {}
-            
-            # Record bias info returned by BiasModeler; do NOT apply a fixed multiplier boost here.
-            base_demand = match_result.get('overall_demand_score', 0)
-            match_result['base_demand_score'] = base_demand
-            match_result['bias_score'] = bias_score
-            match_result['bias_reason'] = bias_reason
-            # Provide a numeric 'bias_boost' field equal to the bias score so downstream formatters
-            # can choose how to present it (no hardcoded adjustment here).
-            match_result['bias_boost'] = bias_score
-            
-            # Add metadata
-            match_result['player_name'] = player.name
-            match_result['team_name'] = team.name
-            match_result['requirements'] = requirements
-            
-            # Add new fields from AuctionPrompt.md format
-            match_result['release_history_factor'] = match_result.get('release_history_factor', 5.0)
-            match_result['synergy_factor'] = match_result.get('synergy_factor', 5.0)
-            match_result['demand_reasoning'] = match_result.get('demand_reasoning', '')
-            
-            return match_result
+            return self._build_match_result(player, team, response, requirements, bias_score, bias_reason)
         except Exception as e:
             print(f"[TEAM_MATCHER] ERROR matching {player.name} to {team.name}: {e}")
             import traceback
             print(f"[TEAM_MATCHER] Traceback: {traceback.format_exc()}")
-            return {
-                'player_name': player.name,
-                'team_name': team.name,
-                'overall_demand_score': 0,
-                'error': str(e)
-            }
+            return self._error_result(player, team, str(e))
     
     def match_player_to_all_teams(
         self,
         player: Player,
         teams: Dict[str, Team]
     ) -> List[Dict[str, Any]]:
-        """Match a player to all teams."""
+        """Match a player to all teams (one batched round of concurrent LLM calls)."""
+        if not self.client:
+            print(f"[TEAM_MATCHER] ERROR: Gemini client is None for {player.name}")
+            return [self._error_result(player, team, 'Gemini client not initialized') for team in teams.values()]
+        
+        # Profile, metrics and tags don't depend on the team, so build them once
+        player_context = self.build_player_context(player)
+        
+        # Teams that structurally cannot sign the player never reach the LLM
         matches = []
-        for team_name, team in teams.items():
-            match_result = self.match_player_to_team(player, team)
-            matches.append(match_result)
+        team_list = []
+        for team in teams.values():
+            reason = self._impossible_match_reason(player, team)
+            if reason:
+                matches.append(self._impossible_result(player, team, reason))
+            else:
+                team_list.append(team)
+        prepared = [self._prepare_match(player, team, player_context) for team in team_list]
         
-        # Sort by demand score
-        matches.sort(key=lambda x: x.get('overall_demand_score', 0), reverse=True)
+        # generate_content_batch dedupes, serves cache hits and runs the rest concurrently;
+        # failed prompts come back as None
+        responses = self.client.generate_content_batch([prompt for prompt, _, _, _ in prepared]) if prepared else []
+        
+        for team, (_, requirements, bias_score, bias_reason), response in zip(team_list, prepared, responses):
+            if response is None:
+                matches.append(self._error_result(player, team, 'LLM request failed'))
+                continue
+            try:
+                matches.append(self._build_match_result(player, team, response, requirements, bias_score, bias_reason))
+            except Exception as e:
+                print(f"[TEAM_MATCHER] ERROR matching {player.name} to {team.name}: {e}")
+                matches.append(self._error_result(player, team, str(e)))
+        
+        # Sort by demand score (every result path sets it)
+        matches.sort(key=itemgetter('overall_demand_score'), reverse=True)
         return matches
-
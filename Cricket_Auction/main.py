@@ -1,8 +1,11 @@
 """Main application for IPL Auction Strategist System."""
 
+import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -12,61 +15,85 @@ from core.data_loader import load_all_data
 from core.state_manager import StateManager
 from core.player_tag_storage import PlayerTagStorage
 from models.auction_state import AuctionState
-from llm.gemini_client import GeminiClient
-from llm.player_tagger import PlayerTagger
-from llm.team_matcher import TeamMatcher
 from core.bias_modeler import BiasModeler
 from core.recommender import Recommender
 from core.player_grouper import PlayerGrouper
 from output.matrix_generator import MatrixGenerator
-from handlers.cli_handler import CLIHandler
-from handlers.live_bid_handler import LiveBidHandler
-from handlers.team_selection_handler import TeamSelectionHandler
+# LLM-tier modules and the mode-specific handlers are imported inside
+# initialize_system, only when the object is actually built
 
 
-def initialize_system():
-    """Initialize the entire system."""
-    print("Initializing IPL Auction Strategist System...")
+# Player attributes that come from the tag store and overwrite the CSV-loaded values
+_TAGGED_FIELDS = (
+    'primary_role', 'batting_role', 'bowling_role', 'speciality', 'quality',
+    'bat_utilization', 'bowl_utilization', 'international_leagues', 'ipl_experience',
+    'scouting', 'smat_performance', 'advanced_metrics'
+)
+
+# Components built by initialize_system, shared by every caller in this process
+_SYSTEM_COMPONENTS: Optional[Dict[str, Any]] = None
+
+logger = logging.getLogger(__name__)
+
+
+def _create_gemini_client():
+    """Create the Gemini client, or None if it can't be initialized."""
+    try:
+        from llm.gemini_client import GeminiClient
+        gemini_client = GeminiClient(api_key=GEMINI_API_KEY, model_name=GEMINI_MODEL)
+        logger.info("Gemini client initialized")
+        return gemini_client
+    except Exception as e:
+        logger.warning("Could not initialize Gemini client: %s. LLM features will be limited", e)
+        return None
+
+
+def initialize_system(mode: str = 'server'):
+    """Initialize the entire system ('cli' or 'server' mode; handlers for the other mode are skipped)."""
+    logger.info("Initializing IPL Auction Strategist System...")
     
     # Initialize tag storage
     tag_storage = PlayerTagStorage()
     
     # Load data
-    print("Loading data from CSV files...")
-    print(f"Data directory: {DATA_DIR}")
+    logger.info("Loading data from CSV files in %s", DATA_DIR)
     if not DATA_DIR.exists():
         raise FileNotFoundError(
             f"Data directory not found at {DATA_DIR}. "
             f"Please ensure the Data folder exists in the project root."
         )
-    players, teams = load_all_data(DATA_DIR)
-    print(f"Loaded {len(players)} players and {len(teams)} teams")
     
-    # Load tagged players if available
-    tagged_players = tag_storage.load_players()
+    # The Gemini client (SDK setup + response-cache load) and the tag CSV don't depend
+    # on the auction CSVs, so build/read them on worker threads while the data loads
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        gemini_future = executor.submit(_create_gemini_client) if GEMINI_API_KEY else None
+        tagged_future = executor.submit(tag_storage.load_players)
+        players, teams = load_all_data(DATA_DIR)
+        logger.info("Loaded %d players and %d teams", len(players), len(teams))
+        
+        # Load tagged players if available
+        tagged_players = tagged_future.result()
+        gemini_client = gemini_future.result() if gemini_future else None
+    
     if tagged_players:
-        print(f"Loading {len(tagged_players)} tagged players from CSV...")
-        # Merge tagged data with existing players
-        tagged_dict = {p.name: p for p in players}
-        for name, tagged_player in tagged_players.items():
-            if name in tagged_dict:
-                # Update existing player with tagged data
-                existing = tagged_dict[name]
-                # Copy tagged attributes
-                existing.primary_role = tagged_player.primary_role
-                existing.batting_role = tagged_player.batting_role
-                existing.bowling_role = tagged_player.bowling_role
-                existing.speciality = tagged_player.speciality
-                existing.quality = tagged_player.quality
-                existing.bat_utilization = tagged_player.bat_utilization
-                existing.bowl_utilization = tagged_player.bowl_utilization
-                existing.international_leagues = tagged_player.international_leagues
-                existing.ipl_experience = tagged_player.ipl_experience
-                existing.scouting = tagged_player.scouting
-                existing.smat_performance = tagged_player.smat_performance
-                existing.advanced_metrics = tagged_player.advanced_metrics
-                existing.metadata.update(tagged_player.metadata)
-        print(f"✓ Merged tagged data for {len(tagged_players)} players")
+        logger.info("Loading %d tagged players from CSV...", len(tagged_players))
+        # Merge tagged data with existing players, walking whichever side is smaller
+        if len(tagged_players) <= len(players):
+            players_by_name = {p.name: p for p in players}
+            pairs = ((players_by_name.get(name), tagged) for name, tagged in tagged_players.items())
+        else:
+            pairs = ((p, tagged_players.get(p.name)) for p in players)
+        for existing, tagged_player in pairs:
+            if existing is None or tagged_player is None:
+                continue
+            # Update existing player with the tags that are actually set; empty/None
+            # values in a partial tag row must not wipe what the CSV load provided
+            for field in _TAGGED_FIELDS:
+                value = getattr(tagged_player, field)
+                if value:
+                    setattr(existing, field, value)
+            existing.metadata.update(tagged_player.metadata)
+        logger.info("Merged tagged data for %d players", len(tagged_players))
     
     # Create auction state
     auction_state = AuctionState()
@@ -76,71 +103,75 @@ def initialize_system():
     # Create state manager
     state_manager = StateManager(auction_state)
     
-    # Initialize Gemini client (if API key available)
-    gemini_client = None
-    if GEMINI_API_KEY:
-        try:
-            gemini_client = GeminiClient(api_key=GEMINI_API_KEY, model_name=GEMINI_MODEL)
-            print("Gemini client initialized")
-        except Exception as e:
-            print(f"Warning: Could not initialize Gemini client: {e}")
-            print("LLM features will be limited")
-    else:
-        print("Warning: GEMINI_API_KEY not set. LLM features will be disabled.")
+    # Gemini client (if API key available) was created alongside the data load
+    if not GEMINI_API_KEY:
+        logger.warning("GEMINI_API_KEY not set. LLM features will be disabled.")
     
     # Initialize components
     bias_modeler = BiasModeler()
     # BiasIntegrator removed per refactor: use BiasModeler directly and let LLM handle bias influence
     bias_integrator = None
     
-    player_tagger = PlayerTagger(gemini_client) if gemini_client else None
-    team_matcher = TeamMatcher(gemini_client, bias_modeler) if gemini_client else None
+    player_tagger = None
+    team_matcher = None
+    llm_executor = None
+    if gemini_client:
+        from llm.player_tagger import PlayerTagger
+        from llm.team_matcher import TeamMatcher
+        # One bounded pool for concurrent Gemini calls, shared by every LLM component
+        llm_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='gemini')
+        player_tagger = PlayerTagger(gemini_client, executor=llm_executor)
+        team_matcher = TeamMatcher(gemini_client, bias_modeler)
     
-    recommender = Recommender(team_matcher) if team_matcher else None
+    recommender = Recommender(team_matcher, executor=llm_executor) if team_matcher else None
     # Always create a PlayerGrouper object; it can operate in a safe no-LLM mode
     # (its methods already handle a missing recommender by returning empty groups).
     player_grouper = PlayerGrouper(recommender)
     matrix_generator = MatrixGenerator(state_manager)
     
-    # Initialize handlers
-    cli_handler = CLIHandler(
-        state_manager, 
-        recommender, 
-        player_grouper, 
-        matrix_generator,
-        player_tagger=player_tagger,
-        tag_storage=tag_storage
-    ) if matrix_generator else None
+    # Initialize handlers (only those the selected mode uses)
+    cli_handler = None
+    if mode == 'cli' and matrix_generator:
+        from handlers.cli_handler import CLIHandler
+        cli_handler = CLIHandler(
+            state_manager, 
+            recommender, 
+            player_grouper, 
+            matrix_generator,
+            player_tagger=player_tagger,
+            tag_storage=tag_storage
+        )
     # Initialize handlers even when LLM-based recommender is unavailable so
     # the API remains responsive; handlers will handle missing recommender
     # gracefully via the PlayerGrouper/Recommender interfaces.
-    live_bid_handler = LiveBidHandler(state_manager, recommender, player_grouper)
-    team_selection_handler = TeamSelectionHandler(state_manager, recommender, player_grouper)
-    
-    print("\n" + "=" * 60)
-    print("SYSTEM INITIALIZATION SUMMARY")
-    print("=" * 60)
-    print(f"StateManager: {state_manager is not None}")
-    print(f"GeminiClient: {gemini_client is not None}")
-    print(f"Recommender: {recommender is not None}")
-    print(f"PlayerGrouper: {player_grouper is not None}")
-    print(f"TeamSelectionHandler: {team_selection_handler is not None}")
-    print(f"LiveBidHandler: {live_bid_handler is not None}")
-    
-    if state_manager:
+    live_bid_handler = None
+    team_selection_handler = None
+    if mode == 'server':
+        from handlers.live_bid_handler import LiveBidHandler
+        from handlers.team_selection_handler import TeamSelectionHandler
+        live_bid_handler = LiveBidHandler(state_manager, recommender, player_grouper)
+        team_selection_handler = TeamSelectionHandler(state_manager, recommender, player_grouper)
+    
+    # Component summary is only assembled when someone is listening at DEBUG
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Components: StateManager=%s GeminiClient=%s Recommender=%s PlayerGrouper=%s "
+            "TeamSelectionHandler=%s LiveBidHandler=%s",
+            state_manager is not None, gemini_client is not None, recommender is not None,
+            player_grouper is not None, team_selection_handler is not None, live_bid_handler is not None
+        )
         teams = state_manager.get_all_teams()
-        available = state_manager.get_available_players()
-        print(f"Teams loaded: {len(teams)}")
-        print(f"Available players: {len(available)}")
-        print(f"Team names: {list(teams.keys())}")
+        logger.debug(
+            "Teams loaded: %d, available players: %d, team names: %s",
+            len(teams), len(state_manager.get_available_players()), list(teams.keys())
+        )
     
-    print("=" * 60)
-    print("System initialized successfully!")
-    print("=" * 60 + "\n")
+    logger.info("System initialized successfully!")
     
     return {
         'state_manager': state_manager,
         'gemini_client': gemini_client,
+        'llm_executor': llm_executor,
         'bias_modeler': bias_modeler,
         'player_tagger': player_tagger,
         'team_matcher': team_matcher,
@@ -154,6 +185,14 @@ def initialize_system():
     }
 
 
+def get_system_components(mode: str = 'server') -> Dict[str, Any]:
+    """Get the process-wide components, initializing the system on first use."""
+    global _SYSTEM_COMPONENTS
+    if _SYSTEM_COMPONENTS is None:
+        _SYSTEM_COMPONENTS = initialize_system(mode)
+    return _SYSTEM_COMPONENTS
+
+
 def run_cli_mode(components):
     """Run CLI mode."""
     cli_handler = components.get('cli_handler')
@@ -196,37 +235,38 @@ def run_server_mode(components):
 def main():
     """Main entry point."""
     import sys
-    # When called directly (python main.py) initialize system and either
-    # run CLI or start an ASGI server. When used as an import target for
+    # When called directly (python main.py) either initialize the system and
+    # run the CLI, or start an ASGI server. When used as an import target for
     # an ASGI server (uvicorn main:app) this function should not be
     # invoked by the server; instead the FastAPI `startup` handler will
     # perform initialization.
 
-    components = initialize_system()
-
-    # Initialize API handlers so the app is ready when run directly
-    from handlers.api_handler import initialize_handlers, set_components
-    initialize_handlers(
-        components['state_manager'],
-        components['recommender'],
-        components['player_grouper'],
-        components['matrix_generator']
+    mode = 'cli' if len(sys.argv) > 1 and sys.argv[1] == '--cli' else 'server'
+    logging.basicConfig(
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    set_components(components)
 
     # CLI or programmatic server
-    if len(sys.argv) > 1 and sys.argv[1] == '--cli':
-        run_cli_mode(components)
+    if mode == 'cli':
+        run_cli_mode(get_system_components(mode))
     else:
-        # Start uvicorn programmatically when running as a script
+        # Don't initialize here: uvicorn imports main:app afresh and the API
+        # lifespan hook initializes the system there, so doing it now as well
+        # would load the data and build the Gemini client twice.
+        # FastAPI and uvicorn are only imported on the server path.
         import uvicorn
         print(f"Starting uvicorn server on http://{API_HOST}:{API_PORT}")
         uvicorn.run("main:app", host=API_HOST, port=API_PORT, reload=False)
 
 
-# Expose FastAPI app for ASGI servers
-# (Initialization happens in api_handler.py via lifespan context manager)
-from handlers.api_handler import app as app
+def __getattr__(name):
+    """Expose the FastAPI app for ASGI servers (uvicorn main:app) without importing it for CLI runs."""
+    # (Initialization happens in api_handler.py via lifespan context manager)
+    if name == 'app':
+        from handlers.api_handler import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
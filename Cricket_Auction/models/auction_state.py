@@ -6,7 +6,7 @@ from .player import Player
 from .team import Team
 
 
-@dataclass
+@dataclass(slots=True)
 class SoldPlayer:
     """Record of a sold player."""
     player: Player
@@ -19,18 +19,42 @@ class SoldPlayer:
 class AuctionState:
     """Real-time auction state management."""
     
-    available_players: List[Player] = field(default_factory=list)
     sold_players: List[SoldPlayer] = field(default_factory=list)
     teams: Dict[str, Team] = field(default_factory=dict)
     
+    # Available supply keyed by name (insertion-ordered) so sales and lookups are O(1);
+    # the available_players list is materialized from it on demand
+    _available_index: Dict[str, Player] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _available_list: Optional[List[Player]] = field(default=None, init=False, repr=False, compare=False)
+    _sold_index: Dict[str, SoldPlayer] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Index any sold players passed in."""
+        for sold in self.sold_players:
+            self._sold_index.setdefault(sold.player.name, sold)
+    
+    @property
+    def available_players(self) -> List[Player]:
+        """Players still in the supply, in load order."""
+        if self._available_list is None:
+            self._available_list = list(self._available_index.values())
+        return self._available_list
+    
+    @available_players.setter
+    def available_players(self, players: List[Player]):
+        """Replace the available supply."""
+        self._available_index = {p.name: p for p in players}
+        self._available_list = None
+    
     def add_sold_player(self, player: Player, team_name: str, price: int, timestamp: Optional[str] = None):
         """Record a player sale and update state."""
         # Remove from available
-        self.available_players = [p for p in self.available_players if p.name != player.name]
+        self.remove_from_supply(player.name)
         
         # Add to sold
         sold = SoldPlayer(player=player, team=team_name, price=price, timestamp=timestamp)
         self.sold_players.append(sold)
+        self._sold_index.setdefault(player.name, sold)
         
         # Update team
         if team_name in self.teams:
@@ -38,7 +62,8 @@ class AuctionState:
     
     def remove_from_supply(self, player_name: str):
         """Remove player from available supply."""
-        self.available_players = [p for p in self.available_players if p.name != player_name]
+        if self._available_index.pop(player_name, None) is not None:
+            self._available_list = None
     
     def update_team_purse(self, team_name: str, amount: int):
         """Update team purse (deduct amount)."""
@@ -48,16 +73,13 @@ class AuctionState:
     def get_player(self, player_name: str) -> Optional[Player]:
         """Get player by name from available or sold."""
         # Check available first
-        for player in self.available_players:
-            if player.name == player_name:
-                return player
+        player = self._available_index.get(player_name)
+        if player is not None:
+            return player
         
         # Check sold
-        for sold in self.sold_players:
-            if sold.player.name == player_name:
-                return sold.player
-        
-        return None
+        sold = self._sold_index.get(player_name)
+        return sold.player if sold is not None else None
     
     def get_team(self, team_name: str) -> Optional[Team]:
         """Get team by name."""
@@ -65,15 +87,27 @@ class AuctionState:
     
     def get_supply_count(self) -> int:
         """Get count of available players."""
-        return len(self.available_players)
+        return len(self._available_index)
     
     def to_dict(self) -> Dict:
         """Export state to dictionary for persistence."""
+        # Every player is serialized once into a name-keyed table; supply, sales and
+        # squads refer to players by name
+        players: Dict[str, Player] = dict(self._available_index)
+        for sold in self.sold_players:
+            players.setdefault(sold.player.name, sold.player)
+        for team in self.teams.values():
+            for player in team.retained_players:
+                players.setdefault(player.name, player)
+            for player in team.bought_players:
+                players.setdefault(player.name, player)
+        
         return {
-            'available_players': [p.to_dict() for p in self.available_players],
+            'players': {name: player.to_dict() for name, player in players.items()},
+            'available_players': list(self._available_index),
             'sold_players': [
                 {
-                    'player': sold.player.to_dict(),
+                    'player': sold.player.name,
                     'team': sold.team,
                     'price': sold.price,
                     'timestamp': sold.timestamp
@@ -85,42 +119,54 @@ class AuctionState:
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'AuctionState':
-        """Import state from dictionary."""
+        """Import state from dictionary (name-referenced format, or the older inline-player format)."""
         from .player import Player as PlayerModel
         from .team import Team as TeamModel
         
-        # Reconstruct players
-        available_players = [PlayerModel.from_dict(p) for p in data.get('available_players', [])]
-        sold_players_data = data.get('sold_players', [])
-        
-        # Create player lookup
-        all_players = {p.name: p for p in available_players}
-        
-        # Reconstruct sold players
-        sold_players = []
-        for sold_data in sold_players_data:
-            player_data = sold_data['player']
-            if player_data['name'] not in all_players:
-                all_players[player_data['name']] = PlayerModel.from_dict(player_data)
-            player = all_players[player_data['name']]
-            sold = SoldPlayer(
-                player=player,
-                team=sold_data['team'],
-                price=sold_data['price'],
-                timestamp=sold_data.get('timestamp')
-            )
-            sold_players.append(sold)
+        if 'players' in data:
+            all_players = {name: PlayerModel.from_dict(p) for name, p in data['players'].items()}
+            available_players = [all_players[name] for name in data.get('available_players', [])]
+            sold_players = [
+                SoldPlayer(
+                    player=all_players[sold_data['player']],
+                    team=sold_data['team'],
+                    price=sold_data['price'],
+                    timestamp=sold_data.get('timestamp')
+                )
+                for sold_data in data.get('sold_players', [])
+            ]
+        else:
+            # Reconstruct players
+            available_players = [PlayerModel.from_dict(p) for p in data.get('available_players', [])]
+            sold_players_data = data.get('sold_players', [])
+            
+            # Create player lookup
+            all_players = {p.name: p for p in available_players}
+            
+            # Reconstruct sold players
+            sold_players = []
+            for sold_data in sold_players_data:
+                player_data = sold_data['player']
+                if player_data['name'] not in all_players:
+                    all_players[player_data['name']] = PlayerModel.from_dict(player_data)
+                player = all_players[player_data['name']]
+                sold = SoldPlayer(
+                    player=player,
+                    team=sold_data['team'],
+                    price=sold_data['price'],
+                    timestamp=sold_data.get('timestamp')
+                )
+                sold_players.append(sold)
         
         # Reconstruct teams
-        teams = {}
-        for team_name, team_data in data.get('teams', {}).items():
-            teams[team_name] = TeamModel.from_dict(team_data, players=list(all_players.values()))
+        teams_data = data.get('teams', {})
+        team_list = TeamModel.from_dict_many(list(teams_data.values()), players=list(all_players.values()))
+        teams = dict(zip(teams_data, team_list))
         
         state = cls(
-            available_players=available_players,
             sold_players=sold_players,
             teams=teams
         )
+        state.available_players = available_players
         
         return state
-
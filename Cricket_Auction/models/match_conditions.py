@@ -1,6 +1,6 @@
 """Match conditions model for tracking pitch, weather, and match context."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 from enum import Enum
 
@@ -14,7 +14,7 @@ class PitchCondition(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchConditions:
     """Track match conditions and context."""
     
@@ -26,12 +26,7 @@ class MatchConditions:
     required_rate: Optional[float] = None
     match_type: Optional[str] = None  # e.g., "league", "playoff", "final"
     venue: Optional[str] = None
-    metadata: Dict[str, Any] = None
-    
-    def __post_init__(self):
-        """Initialize metadata if not provided."""
-        if self.metadata is None:
-            self.metadata = {}
+    metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -63,6 +58,6 @@ class MatchConditions:
             required_rate=data.get('required_rate'),
             match_type=data.get('match_type'),
             venue=data.get('venue'),
-            metadata=data.get('metadata', {})
+            metadata=data.get('metadata') or {}
         )
 
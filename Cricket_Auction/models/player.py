@@ -1,5 +1,6 @@
 """Player model with comprehensive tagging and advanced metrics."""
 
+import sys
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional, Dict, Any
 from enum import Enum
@@ -47,24 +48,23 @@ class Quality(Enum):
     B = "B"
 
 
-@dataclass
+# value -> member lookups for deserialization; a dict hit is far cheaper than Enum(value)
+_PRIMARY_ROLE_MAP = {e.value: e for e in PrimaryRole}
+_BATTING_ROLE_MAP = {e.value: e for e in BattingRole}
+_BOWLING_ROLE_MAP = {e.value: e for e in BowlingRole}
+_SPECIALITY_MAP = {e.value: e for e in Speciality}
+_QUALITY_MAP = {e.value: e for e in Quality}
+
+
+@dataclass(slots=True)
 class PhaseMetrics:
     """Phase-wise metrics for a player."""
-    powerplay: Optional[Dict[str, float]] = None  # {efscore, winp, raa}
-    middle_overs: Optional[Dict[str, float]] = None
-    death: Optional[Dict[str, float]] = None
-    
-    def __post_init__(self):
-        """Initialize metrics if not provided."""
-        if self.powerplay is None:
-            self.powerplay = {}
-        if self.middle_overs is None:
-            self.middle_overs = {}
-        if self.death is None:
-            self.death = {}
+    powerplay: Dict[str, float] = field(default_factory=dict)  # {efscore, winp, raa}
+    middle_overs: Dict[str, float] = field(default_factory=dict)
+    death: Dict[str, float] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Player:
     """Comprehensive player model with advanced metrics and conditions tracking."""
     
@@ -103,6 +103,31 @@ class Player:
     # Additional metadata
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # Running [count, sum, sum of squares] of per-condition performance for the balance score;
+    # None until first needed, then kept current by add_match_condition
+    _balance_totals: Optional[List[float]] = field(default=None, init=False, repr=False, compare=False)
+    
+    # Last to_dict() result; dropped on any attribute assignment. Container fields are
+    # shared by reference, so in-place list/dict updates show through without invalidating
+    _cached_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any):
+        """Set an attribute and invalidate the cached to_dict() snapshot (and balance totals if their source changes)."""
+        object.__setattr__(self, name, value)
+        if name != '_cached_dict':
+            object.__setattr__(self, '_cached_dict', None)
+            if name == 'performance_by_conditions':
+                object.__setattr__(self, '_balance_totals', None)
+    
+    def __post_init__(self):
+        """Intern the low-cardinality string fields so repeated values share one object."""
+        if self.country:
+            self.country = sys.intern(self.country)
+        if self.batting_hand:
+            self.batting_hand = sys.intern(self.batting_hand)
+        if self.bowling_style:
+            self.bowling_style = sys.intern(self.bowling_style)
+    
     def add_match_condition(self, match_id: str, conditions: Dict[str, Any], performance: Dict[str, Any]):
         """Add match condition and performance data."""
         self.match_conditions.append((match_id, {**conditions, 'performance': performance}))
@@ -119,11 +144,25 @@ class Player:
             }
         
         stats = self.performance_by_conditions[wickets_key]
+        totals = self._balance_totals
+        if totals is not None and stats['matches'] > 0:
+            # Retract this condition's previous contribution before updating it
+            old_perf = stats['avg_runs'] + (stats['avg_wickets'] * 20)
+            totals[0] -= 1
+            totals[1] -= old_perf
+            totals[2] -= old_perf * old_perf
+        
         stats['matches'] += 1
         stats['runs'] += performance.get('runs', 0)
         stats['wickets'] += performance.get('wickets', 0)
         stats['avg_runs'] = stats['runs'] / stats['matches']
         stats['avg_wickets'] = stats['wickets'] / stats['matches']
+        
+        if totals is not None:
+            perf = stats['avg_runs'] + (stats['avg_wickets'] * 20)
+            totals[0] += 1
+            totals[1] += perf
+            totals[2] += perf * perf
     
     def get_conditions_balance_score(self) -> float:
         """Calculate how balanced the player is across different conditions."""
@@ -132,18 +171,25 @@ class Player:
         
         # Calculate variance in performance across conditions
         # Lower variance = more balanced
-        performances = []
-        for condition_stats in self.performance_by_conditions.values():
-            if condition_stats['matches'] > 0:
-                # Combine runs and wickets into a single performance metric
-                perf = condition_stats['avg_runs'] + (condition_stats['avg_wickets'] * 20)
-                performances.append(perf)
+        totals = self._balance_totals
+        if totals is None:
+            # First call (or data loaded via from_dict): one pass, then kept incrementally
+            totals = [0, 0.0, 0.0]
+            for condition_stats in self.performance_by_conditions.values():
+                if condition_stats['matches'] > 0:
+                    # Combine runs and wickets into a single performance metric
+                    perf = condition_stats['avg_runs'] + (condition_stats['avg_wickets'] * 20)
+                    totals[0] += 1
+                    totals[1] += perf
+                    totals[2] += perf * perf
+            self._balance_totals = totals
         
-        if len(performances) < 2:
+        count, total, total_sq = totals
+        if count < 2:
             return 0.5  # Not enough data
         
-        mean_perf = sum(performances) / len(performances)
-        variance = sum((p - mean_perf) ** 2 for p in performances) / len(performances)
+        mean_perf = total / count
+        variance = max(total_sq / count - mean_perf * mean_perf, 0.0)
         
         # Normalize to 0-1 scale (inverse variance, higher = more balanced)
         max_variance = 1000  # Arbitrary max
@@ -151,8 +197,10 @@ class Player:
         return balance_score
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert player to dictionary."""
-        return {
+        """Convert player to dictionary (cached until an attribute is reassigned; don't mutate the result)."""
+        if self._cached_dict is not None:
+            return self._cached_dict
+        self._cached_dict = {
             'name': self.name,
             'base_price': self.base_price,
             'country': self.country,
@@ -178,6 +226,7 @@ class Player:
             'performance_by_conditions': self.performance_by_conditions,
             'metadata': self.metadata
         }
+        return self._cached_dict
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Player':
@@ -199,17 +248,22 @@ class Player:
             metadata=data.get('metadata', {})
         )
         
-        # Set enums
-        if data.get('primary_role'):
-            player.primary_role = PrimaryRole(data['primary_role'])
-        if data.get('batting_role'):
-            player.batting_role = BattingRole(data['batting_role'])
-        if data.get('bowling_role'):
-            player.bowling_role = BowlingRole(data['bowling_role'])
-        if data.get('speciality'):
-            player.speciality = Speciality(data['speciality'])
-        if data.get('quality'):
-            player.quality = Quality(data['quality'])
+        # Set enums (unknown values still go through the Enum call so they raise ValueError)
+        value = data.get('primary_role')
+        if value:
+            player.primary_role = _PRIMARY_ROLE_MAP.get(value) or PrimaryRole(value)
+        value = data.get('batting_role')
+        if value:
+            player.batting_role = _BATTING_ROLE_MAP.get(value) or BattingRole(value)
+        value = data.get('bowling_role')
+        if value:
+            player.bowling_role = _BOWLING_ROLE_MAP.get(value) or BowlingRole(value)
+        value = data.get('speciality')
+        if value:
+            player.speciality = _SPECIALITY_MAP.get(value) or Speciality(value)
+        value = data.get('quality')
+        if value:
+            player.quality = _QUALITY_MAP.get(value) or Quality(value)
         
         # Set advanced metrics
         if data.get('advanced_metrics'):
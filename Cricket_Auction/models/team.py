@@ -1,11 +1,12 @@
 """Team model with home ground conditions and squad management."""
 
 from dataclasses import dataclass, field
+from itertools import chain
 from typing import List, Optional, Dict, Any
 from .player import Player
 
 
-@dataclass
+@dataclass(slots=True)
 class Team:
     """Team model with players, purse, and home ground conditions."""
     
@@ -37,10 +38,7 @@ class Team:
     @property
     def total_foreign_players(self) -> int:
         """Total foreign players in squad."""
-        return (
-            sum(1 for p in self.retained_players if p.country != "Indian") +
-            sum(1 for p in self.bought_players if p.country != "Indian")
-        )
+        return sum(1 for p in chain(self.retained_players, self.bought_players) if p.country != "Indian")
     
     @property
     def available_slots(self) -> int:
@@ -87,6 +85,17 @@ class Team:
     @classmethod
     def from_dict(cls, data: Dict[str, Any], players: Optional[List[Player]] = None) -> 'Team':
         """Create team from dictionary."""
+        return cls.from_dict_many([data], players)[0]
+    
+    @classmethod
+    def from_dict_many(cls, data_list: List[Dict[str, Any]], players: Optional[List[Player]] = None) -> List['Team']:
+        """Create teams from dictionaries, indexing the players by name once for all of them."""
+        player_dict = {p.name: p for p in players} if players else None
+        return [cls._from_dict(data, player_dict) for data in data_list]
+    
+    @classmethod
+    def _from_dict(cls, data: Dict[str, Any], player_dict: Optional[Dict[str, Player]]) -> 'Team':
+        """Create one team, linking squad names through the prebuilt player index."""
         team = cls(
             name=data['name'],
             home_ground=data['home_ground'],
@@ -102,10 +111,9 @@ class Team:
         )
         
         # Link players if provided
-        if players:
-            player_dict = {p.name: p for p in players}
-            team.retained_players = [player_dict[name] for name in data.get('retained_players', []) if name in player_dict]
-            team.bought_players = [player_dict[name] for name in data.get('bought_players', []) if name in player_dict]
+        if player_dict:
+            get_player = player_dict.get
+            team.retained_players = [p for p in map(get_player, data.get('retained_players', [])) if p is not None]
+            team.bought_players = [p for p in map(get_player, data.get('bought_players', [])) if p is not None]
         
         return team
-
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Any
 
 
-@dataclass
+@dataclass(slots=True)
 class U19Player:
     """U19 player model from authorized sources."""
     
@@ -22,6 +22,13 @@ class U19Player:
     source: str = ""  # Website source
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # Lowercased name for case-insensitive matching against supply
+    _name_lower: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Precompute the lowercased name."""
+        self._name_lower = self.name.lower()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return {
@@ -1,12 +1,30 @@
 """Supply & demand matrix generator."""
 
+from collections import defaultdict
 from typing import Dict, List, Any
 from models.team import Team
-from models.player import Player
+from models.player import Player, Quality
 from core.state_manager import StateManager
 from core.playing11_analyzer import Playing11Analyzer
 
 
+# identify_gaps role keys and the line reported when that role is short, in display order
+_ROLE_GAP_TEMPLATES = (
+    ('opener', "  - Missing {} opener(s)"),
+    ('wk', "  - Missing wicket-keeper"),
+    ('spinner', "  - Missing {} spinner(s)"),
+    ('pacer', "  - Missing {} pacer(s)"),
+    ('finisher', "  - Missing {} finisher(s)"),
+)
+
+
+def _player_line(player: Player) -> str:
+    """Format a squad line with the player's quality tier, if tagged."""
+    if player.quality:
+        return f"    - {player.name} ({player.quality.value})"
+    return f"    - {player.name}"
+
+
 class MatrixGenerator:
     """Generate team-wise supply & demand matrices."""
     
@@ -18,46 +36,50 @@ class MatrixGenerator:
     def generate_team_matrix(self, team: Team) -> str:
         """Generate matrix for a single team."""
         lines = []
-        
-        # Header
-        lines.append(f"=== {team.name} ===")
-        lines.append(f"Home Ground: {team.home_ground} ({team.ground_condition})")
-        lines.append("")
-        
-        # Summary
-        lines.append("Summary:")
-        lines.append(f"  Total Players: {team.total_players}/{team.total_slots}")
-        lines.append(f"  Foreign Players: {team.total_foreign_players}/{team.foreign_slots}")
-        lines.append(f"  Purse Available: {team.purse_available / 100:.1f} Cr")
-        lines.append(f"  Available Slots: {team.available_slots}")
-        lines.append(f"  Available Foreign Slots: {team.available_foreign_slots}")
-        lines.append("")
+        self._emit_team(team, lines)
+        return "\n".join(lines)
+    
+    def _emit_team(self, team: Team, lines: List[str]):
+        """Append a team's matrix lines to lines."""
+        # Header and summary (foreign count walks the squad, so take it once)
+        foreign_players = team.total_foreign_players
+        lines.extend((
+            f"=== {team.name} ===",
+            f"Home Ground: {team.home_ground} ({team.ground_condition})",
+            "",
+            "Summary:",
+            f"  Total Players: {team.total_players}/{team.total_slots}",
+            f"  Foreign Players: {foreign_players}/{team.foreign_slots}",
+            f"  Purse Available: {team.purse_available / 100:.1f} Cr",
+            f"  Available Slots: {team.available_slots}",
+            f"  Available Foreign Slots: {team.foreign_slots - foreign_players}",
+            "",
+        ))
         
         # Players
         lines.append("Players:")
         lines.append("  Retained:")
-        for player in team.retained_players:
-            quality = f" ({player.quality.value})" if player.quality else ""
-            lines.append(f"    - {player.name}{quality}")
+        lines.extend(_player_line(player) for player in team.retained_players)
         
         if team.bought_players:
             lines.append("  Bought:")
-            for player in team.bought_players:
-                quality = f" ({player.quality.value})" if player.quality else ""
-                lines.append(f"    - {player.name}{quality}")
+            lines.extend(_player_line(player) for player in team.bought_players)
         
         lines.append("")
         
-        # Speciality breakdown
-        lines.append("Speciality Breakdown:")
-        specialities = {}
+        # Speciality and quality breakdowns, gathered in one pass over the squad
+        specialities = defaultdict(list)
+        tier_a = []
+        tier_b = []
         for player in team.get_all_players():
             if player.speciality:
-                spec = player.speciality.value
-                if spec not in specialities:
-                    specialities[spec] = []
-                specialities[spec].append(player.name)
+                specialities[player.speciality.value].append(player.name)
+            if player.quality is Quality.A:
+                tier_a.append(player.name)
+            elif player.quality is Quality.B:
+                tier_b.append(player.name)
         
+        lines.append("Speciality Breakdown:")
         for spec, players in specialities.items():
             lines.append(f"  {spec}: {', '.join(players)}")
         
@@ -65,8 +87,6 @@ class MatrixGenerator:
         
         # Quality breakdown
         lines.append("Quality Breakdown:")
-        tier_a = [p.name for p in team.get_all_players() if p.quality and p.quality.value == 'A']
-        tier_b = [p.name for p in team.get_all_players() if p.quality and p.quality.value == 'B']
         lines.append(f"  Tier A: {', '.join(tier_a) if tier_a else 'None'}")
         lines.append(f"  Tier B: {', '.join(tier_b) if tier_b else 'None'}")
         lines.append("")
@@ -85,23 +105,16 @@ class MatrixGenerator:
         role_gaps = gaps.get('role_gaps', {})
         quality_gaps = gaps.get('quality_gaps', {})
         
-        if role_gaps.get('opener', 0) > 0:
-            lines.append(f"  - Missing {role_gaps['opener']} opener(s)")
-        if role_gaps.get('wk', 0) > 0:
-            lines.append(f"  - Missing wicket-keeper")
-        if role_gaps.get('spinner', 0) > 0:
-            lines.append(f"  - Missing {role_gaps['spinner']} spinner(s)")
-        if role_gaps.get('pacer', 0) > 0:
-            lines.append(f"  - Missing {role_gaps['pacer']} pacer(s)")
-        if role_gaps.get('finisher', 0) > 0:
-            lines.append(f"  - Missing {role_gaps['finisher']} finisher(s)")
-        if quality_gaps.get('tier_a_needed', 0) > 0:
-            lines.append(f"  - Missing {quality_gaps['tier_a_needed']} Tier A player(s)")
+        for key, template in _ROLE_GAP_TEMPLATES:
+            count = role_gaps.get(key, 0)
+            if count > 0:
+                lines.append(template.format(count))
+        tier_a_needed = quality_gaps.get('tier_a_needed', 0)
+        if tier_a_needed > 0:
+            lines.append(f"  - Missing {tier_a_needed} Tier A player(s)")
         
         if gaps.get('total_gaps', 0) == 0:
             lines.append("  - No critical gaps identified")
-        
-        return "\n".join(lines)
     
     def generate_all_matrices(self) -> str:
         """Generate matrices for all teams."""
@@ -110,7 +123,7 @@ class MatrixGenerator:
         
         lines = []
         for team_name, team in teams.items():
-            lines.append(self.generate_team_matrix(team))
+            self._emit_team(team, lines)
             lines.append("")
             lines.append("---")
             lines.append("")
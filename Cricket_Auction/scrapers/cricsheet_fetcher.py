@@ -1,53 +1,115 @@
 """Cricsheet.org data fetcher for ball-by-ball match data."""
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import orjson
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from threading import Lock
+from typing import List, Dict, Optional, Any, Tuple
 import time
 
+# LibYAML's C loader when PyYAML was built with it; same safe semantics as yaml.safe_load
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 
 class CricsheetFetcher:
     """Fetches and parses match data from cricsheet.org."""
     
     BASE_URL = "https://cricsheet.org"
     CACHE_DIR = Path("cache/cricsheet")
+    MAX_WORKERS = 8  # concurrent match downloads
+    REQUEST_INTERVAL = 0.5  # minimum seconds between request starts (rate limit)
     
-    def __init__(self, cache_dir: Optional[str] = None):
-        """Initialize fetcher."""
+    def __init__(self, cache_dir: Optional[str] = None, rate_limit: Optional[float] = None):
+        """Initialize fetcher (rate_limit: seconds between network requests, default REQUEST_INTERVAL)."""
         if cache_dir:
             self.CACHE_DIR = Path(cache_dir)
+        if rate_limit is not None:
+            self.REQUEST_INTERVAL = rate_limit
         self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # One keep-alive session so downloads reuse connections instead of a new TLS handshake each
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount('https://', adapter)
+        self._rate_lock = Lock()
+        self._next_request_at = 0.0
+        
+        # (competition, year) -> [(match, lowercased batter/bowler names)], built once per fetcher
+        self._match_index: Dict[Tuple[str, Optional[int]], List[Tuple[Dict[str, Any], Tuple[str, ...]]]] = {}
+    
+    def _wait_for_rate_limit(self):
+        """Block until this request's slot in the shared rate limit comes up."""
+        with self._rate_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self.REQUEST_INTERVAL
+        if start_at > now:
+            time.sleep(start_at - now)
+    
+    def _read_cache(self, cache_file: Path) -> Any:
+        """Load a JSON cache file, migrating a legacy YAML cache of the same name on first use."""
+        if cache_file.exists():
+            return orjson.loads(cache_file.read_bytes())
+        legacy_file = cache_file.with_suffix('.yaml')
+        if legacy_file.exists():
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=_YamlLoader)
+            self._write_cache(cache_file, data)
+            return data
+        return None
     
-    def download_match_list(self, competition: str, year: Optional[int] = None) -> List[str]:
-        """Download list of match IDs for a competition."""
+    def _write_cache(self, cache_file: Path, data: Any):
+        """Write parsed data as JSON (YAML keys such as over numbers become strings)."""
+        cache_file.write_bytes(orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS))
+    
+    def download_match_list(self, competition: str, year: Optional[int] = None, refresh: bool = False) -> List[str]:
+        """Download list of match IDs for a competition (refresh: revalidate a cached list with the server)."""
         # Cricsheet.org provides match lists in YAML format
         if year:
             url = f"{self.BASE_URL}/matches/{competition}_{year}.yaml"
         else:
             url = f"{self.BASE_URL}/matches/{competition}.yaml"
         
-        cache_file = self.CACHE_DIR / f"{competition}_{year or 'all'}_list.yaml"
+        # Parsed once with PyYAML, then cached as JSON so warm runs skip the slow YAML parse
+        cache_file = self.CACHE_DIR / f"{competition}_{year or 'all'}_list.json"
+        etag_file = cache_file.with_suffix('.etag')
         
         # Check cache
-        if cache_file.exists():
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                try:
-                    data = yaml.safe_load(f)
-                    return [match.get('id', '') for match in data if match.get('id')]
-                except:
-                    pass
+        data = None
+        try:
+            data = self._read_cache(cache_file)
+            if data is not None and not refresh:
+                return [match.get('id', '') for match in data if match.get('id')]
+        except:
+            pass
+        
+        # A refresh sends the stored ETag so an unchanged list costs a 304, not a re-download
+        headers = {}
+        if data is not None and etag_file.exists():
+            headers['If-None-Match'] = etag_file.read_text(encoding='utf-8')
         
         try:
-            response = requests.get(url, timeout=30)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, headers=headers, timeout=30)
+            if response.status_code == 304:
+                return [match.get('id', '') for match in data if match.get('id')]
             response.raise_for_status()
             
+            data = yaml.load(response.text, Loader=_YamlLoader)
+            
             # Save to cache
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            self._write_cache(cache_file, data)
+            etag = response.headers.get('ETag')
+            if etag:
+                etag_file.write_text(etag, encoding='utf-8')
             
-            data = yaml.safe_load(response.text)
             return [match.get('id', '') for match in data if match.get('id')]
         except Exception as e:
             print(f"Error downloading match list: {e}")
@@ -55,28 +117,28 @@ class CricsheetFetcher:
     
     def download_match(self, match_id: str, competition: str) -> Optional[Dict[str, Any]]:
         """Download a single match by ID."""
-        cache_file = self.CACHE_DIR / f"{competition}_{match_id}.yaml"
+        cache_file = self.CACHE_DIR / f"{competition}_{match_id}.json"
         
         # Check cache
-        if cache_file.exists():
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f)
-            except Exception as e:
-                print(f"Error reading cached match {match_id}: {e}")
+        try:
+            match_data = self._read_cache(cache_file)
+            if match_data is not None:
+                return match_data
+        except Exception as e:
+            print(f"Error reading cached match {match_id}: {e}")
         
         # Download match
         url = f"{self.BASE_URL}/matches/{match_id}.yaml"
         
         try:
-            response = requests.get(url, timeout=30)
+            self._wait_for_rate_limit()
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
-            match_data = yaml.safe_load(response.text)
+            match_data = yaml.load(response.text, Loader=_YamlLoader)
             
             # Save to cache
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                yaml.dump(match_data, f, default_flow_style=False, allow_unicode=True)
+            self._write_cache(cache_file, match_data)
             
             return match_data
         except Exception as e:
@@ -90,17 +152,18 @@ class CricsheetFetcher:
         if limit:
             match_ids = match_ids[:limit]
         
-        matches = []
-        for i, match_id in enumerate(match_ids):
-            print(f"Downloading match {i+1}/{len(match_ids)}: {match_id}")
-            match_data = self.download_match(match_id, competition)
-            if match_data:
-                matches.append(match_data)
-            
-            # Rate limiting
-            time.sleep(0.5)
+        total = len(match_ids)
+        
+        def fetch(indexed_id):
+            i, match_id = indexed_id
+            print(f"Downloading match {i+1}/{total}: {match_id}")
+            return self.download_match(match_id, competition)
         
-        return matches
+        # Downloads overlap on a bounded pool; only network requests wait on the
+        # rate limit, so cached matches no longer pay the per-match delay
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            results = executor.map(fetch, enumerate(match_ids))
+            return [match_data for match_data in results if match_data]
     
     def parse_match_for_player(self, match_data: Dict[str, Any], player_name: str) -> List[Dict[str, Any]]:
         """Extract player performance data from match."""
@@ -109,6 +172,11 @@ class CricsheetFetcher:
         if 'innings' not in match_data:
             return performances
         
+        player_lower = player_name.lower()
+        # A match has only a couple of dozen distinct batter/bowler names, so the
+        # lowercase substring test is done once per name rather than once per ball
+        name_matches: Dict[str, bool] = {}
+        
         for innings in match_data['innings']:
             team = innings.get('team', '')
             deliveries = innings.get('deliveries', [])
@@ -117,50 +185,48 @@ class CricsheetFetcher:
             wickets_fallen = 0
             
             for over_num, over_data in deliveries.items():
+                over = int(float(over_num))
+                
+                # Determine phase (once per over)
+                if over <= 6:
+                    phase = "powerplay"
+                elif over <= 15:
+                    phase = "middle_overs"
+                else:
+                    phase = "death"
+                
                 for ball_num, ball_data in over_data.items():
                     # Check if player batted
-                    if 'batter' in ball_data and player_name.lower() in ball_data['batter'].lower():
-                        runs = ball_data.get('runs', {}).get('batter', 0)
-                        over = int(float(over_num))
-                        
-                        # Determine phase
-                        if over <= 6:
-                            phase = "powerplay"
-                        elif over <= 15:
-                            phase = "middle_overs"
-                        else:
-                            phase = "death"
-                        
-                        performances.append({
-                            'over': over,
-                            'ball': ball_num,
-                            'runs': runs,
-                            'phase': phase,
-                            'wickets_fallen': wickets_fallen,
-                            'team': team
-                        })
+                    batter = ball_data.get('batter')
+                    if batter is not None:
+                        is_player = name_matches.get(batter)
+                        if is_player is None:
+                            is_player = name_matches[batter] = player_lower in batter.lower()
+                        if is_player:
+                            performances.append({
+                                'over': over,
+                                'ball': ball_num,
+                                'runs': ball_data.get('runs', {}).get('batter', 0),
+                                'phase': phase,
+                                'wickets_fallen': wickets_fallen,
+                                'team': team
+                            })
                     
                     # Check if player bowled
-                    if 'bowler' in ball_data and player_name.lower() in ball_data['bowler'].lower():
-                        runs = ball_data.get('runs', {}).get('total', 0)
-                        wicket = 'wicket' in ball_data
-                        over = int(float(over_num))
-                        
-                        if over <= 6:
-                            phase = "powerplay"
-                        elif over <= 15:
-                            phase = "middle_overs"
-                        else:
-                            phase = "death"
-                        
-                        performances.append({
-                            'over': over,
-                            'ball': ball_num,
-                            'runs_conceded': runs,
-                            'wicket': wicket,
-                            'phase': phase,
-                            'team': team
-                        })
+                    bowler = ball_data.get('bowler')
+                    if bowler is not None:
+                        is_player = name_matches.get(bowler)
+                        if is_player is None:
+                            is_player = name_matches[bowler] = player_lower in bowler.lower()
+                        if is_player:
+                            performances.append({
+                                'over': over,
+                                'ball': ball_num,
+                                'runs_conceded': ball_data.get('runs', {}).get('total', 0),
+                                'wicket': 'wicket' in ball_data,
+                                'phase': phase,
+                                'team': team
+                            })
                     
                     # Track wickets
                     if 'wicket' in ball_data:
@@ -168,35 +234,46 @@ class CricsheetFetcher:
         
         return performances
     
+    def _get_indexed_matches(self, competition: str, year: Optional[int]) -> List[Tuple[Dict[str, Any], Tuple[str, ...]]]:
+        """Load a competition's matches once, each paired with the names that appear in it."""
+        key = (competition, year)
+        indexed = self._match_index.get(key)
+        if indexed is None:
+            indexed = []
+            for match in self.download_competition_matches(competition, year):
+                names = set()
+                for innings in match.get('innings', []):
+                    for over_data in innings.get('deliveries', {}).values():
+                        for ball_data in over_data.values():
+                            names.add(ball_data.get('batter'))
+                            names.add(ball_data.get('bowler'))
+                names.discard(None)
+                indexed.append((match, tuple(name.lower() for name in names)))
+            self._match_index[key] = indexed
+        return indexed
+    
     def get_player_matches(self, player_name: str, competitions: List[str], years: Optional[List[int]] = None) -> List[Dict[str, Any]]:
         """Get all matches for a player across competitions."""
         all_matches = []
+        player_lower = player_name.lower()
         
         for competition in competitions:
-            if years:
-                for year in years:
-                    matches = self.download_competition_matches(competition, year)
-                    for match in matches:
-                        performances = self.parse_match_for_player(match, player_name)
-                        if performances:
-                            all_matches.append({
-                                'match_id': match.get('meta', {}).get('match_id', ''),
-                                'competition': competition,
-                                'year': year,
-                                'performances': performances,
-                                'match_data': match
-                            })
-            else:
-                matches = self.download_competition_matches(competition)
-                for match in matches:
+            for year in (years or [None]):
+                # Matches are loaded once per fetcher and only parsed ball-by-ball
+                # when the player's name actually appears in them
+                for match, names in self._get_indexed_matches(competition, year):
+                    if not any(player_lower in name for name in names):
+                        continue
                     performances = self.parse_match_for_player(match, player_name)
                     if performances:
-                        all_matches.append({
+                        entry = {
                             'match_id': match.get('meta', {}).get('match_id', ''),
                             'competition': competition,
                             'performances': performances,
                             'match_data': match
-                        })
+                        }
+                        if year is not None:
+                            entry['year'] = year
+                        all_matches.append(entry)
         
         return all_matches
-
@@ -4,6 +4,7 @@ from typing import Dict, List, Any, Optional
 from models.player import Player
 from pathlib import Path
 import json
+import orjson
 
 
 class DataAggregator:
@@ -41,8 +42,18 @@ class DataAggregator:
     
     def combine_all_sources(self, players: List[Player]) -> Dict[str, Dict[str, Any]]:
         """Combine all data sources for all players."""
-        aggregated_data = {}
-        for player in players:
-            aggregated_data[player.name] = self.aggregate_player_data(player)
-        return aggregated_data
+        return {player.name: self.aggregate_player_data(player) for player in players}
+    
+    def save_aggregated(self, aggregated_data: Dict[str, Dict[str, Any]], filename: str = "players.json") -> Path:
+        """Persist combined data to the cache directory so later runs can skip re-aggregating."""
+        cache_file = self.cache_dir / filename
+        cache_file.write_bytes(orjson.dumps(aggregated_data, option=orjson.OPT_NON_STR_KEYS))
+        return cache_file
+    
+    def load_aggregated(self, filename: str = "players.json") -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load previously saved combined data, or None if it hasn't been saved."""
+        cache_file = self.cache_dir / filename
+        if not cache_file.exists():
+            return None
+        return orjson.loads(cache_file.read_bytes())
 
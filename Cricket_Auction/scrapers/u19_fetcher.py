@@ -38,10 +38,12 @@ class U19Fetcher:
     def link_to_supply(self, u19_players: List[U19Player], supply_players: List) -> Dict[str, str]:
         """Link U19 players to supply players if they appear."""
         links = {}
+        # Index supply once so each U19 player is a single lookup, not a scan of the supply list
+        supply_by_lower = {p.name.lower(): p for p in supply_players if hasattr(p, 'name')}
         for u19_player in u19_players:
-            for supply_player in supply_players:
-                if hasattr(supply_player, 'name') and u19_player.name.lower() == supply_player.name.lower():
-                    links[u19_player.name] = supply_player.name
-                    u19_player.linked_player_name = supply_player.name
+            supply_player = supply_by_lower.get(u19_player._name_lower)
+            if supply_player is not None:
+                links[u19_player.name] = supply_player.name
+                u19_player.linked_player_name = supply_player.name
         return links
 
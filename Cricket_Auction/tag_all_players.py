@@ -1,8 +1,9 @@
-"""Automated script to tag all players in batches of 10."""
+"""Automated script to tag all players in batches (TAG_BATCH_SIZE, up to 10)."""
 
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Change to script directory to ensure relative paths work
@@ -12,7 +13,7 @@ os.chdir(script_dir)
 # Add current directory to path
 sys.path.insert(0, str(script_dir))
 
-from config import GEMINI_API_KEY, GEMINI_MODEL, DATA_DIR
+from config import GEMINI_API_KEY, GEMINI_MODEL, DATA_DIR, TAG_CONCURRENCY, TAG_BATCH_SIZE
 from core.data_loader import load_all_data
 from core.state_manager import StateManager
 from core.player_tag_storage import PlayerTagStorage
@@ -44,8 +45,7 @@ def initialize_tagging_system():
     players, teams = load_all_data(str(DATA_DIR))
     print(f"[OK] Loaded {len(players)} players and {len(teams)} teams")
     
-    # Check existing tagged players
-    tagged_players = tag_storage.load_players()
+    # Check existing tagged players (names only; the tags themselves aren't needed to resume)
     tagged_names = set(tag_storage.get_tagged_player_names())
     print(f"[OK] Found {len(tagged_names)} already tagged players")
     
@@ -80,62 +80,69 @@ def initialize_tagging_system():
     }
 
 
-def tag_batch(players, player_tagger, tag_storage, batch_num, total_batches):
-    """Tag a batch of players (up to 10) in a single LLM call."""
+def request_batch_tags(players, player_tagger):
+    """Run the LLM tagging for one batch; returns (tagged_players, errors). Prints nothing, so it can run on a worker thread."""
+    errors = []
+    
+    try:
+        # Tag all players in a single LLM call
+        return player_tagger.tag_players_batch(players), errors
+    except Exception as e:
+        errors.append(f"Error in batch tagging: {str(e)}")
+    
+    # Fallback: try individual tagging
+    tagged_players = []
+    for player in players:
+        try:
+            tagged_players.append(player_tagger.tag_player(player))
+            time.sleep(0.2)  # Rate limiting
+        except Exception as e2:
+            errors.append(f"Error tagging {player.name}: {str(e2)}")
+    
+    return tagged_players, errors
+
+
+def tag_batch(players, player_tagger, tag_storage, batch_num, total_batches, batch_tags=None, write_players=None):
+    """Tag a batch of players (up to PlayerTagger.MAX_BATCH_SIZE) in a single LLM call, report and save it.
+    
+    batch_tags is an already-finished request_batch_tags result; write_players is an
+    appender from tag_storage.open_append() (otherwise each save reopens the CSV).
+    """
     print(f"\n{'=' * 60}")
     print(f"Batch {batch_num}/{total_batches} - Tagging {len(players)} players")
     print(f"{'=' * 60}")
-    print(f"\n[SENDING] Sending {len(players)} players to LLM in one batch call...")
     
     # Show players being tagged
     for i, player in enumerate(players, 1):
         print(f"  {i}. {player.name} ({player.country}) - {player.base_price}L")
     
-    tagged_players = []
-    errors = []
+    if batch_tags is None:
+        print(f"\n[SENDING] Sending {len(players)} players to LLM in one batch call...")
+        batch_tags = request_batch_tags(players, player_tagger)
+    tagged_players, errors = batch_tags
     
-    try:
-        # Tag all players in a single LLM call
-        tagged_players = player_tagger.tag_players_batch(players)
+    # Show results
+    print(f"\n[RESULTS] Received tags for {len(tagged_players)} players:")
+    for i, tagged_player in enumerate(tagged_players, 1):
+        role = tagged_player.primary_role.value if tagged_player.primary_role else "N/A"
+        quality = tagged_player.quality.value if tagged_player.quality else "N/A"
         
-        # Show results
-        print(f"\n[RESULTS] Received tags for {len(tagged_players)} players:")
-        for i, tagged_player in enumerate(tagged_players, 1):
-            role = tagged_player.primary_role.value if tagged_player.primary_role else "N/A"
-            quality = tagged_player.quality.value if tagged_player.quality else "N/A"
-            
-            # Show advanced metrics if available
-            metrics_info = ""
-            if tagged_player.advanced_metrics:
-                pp = tagged_player.advanced_metrics.powerplay or {}
-                if pp.get('efscore'):
-                    metrics_info = f" | PP-efscore: {pp.get('efscore', 0):.1f}"
-            
-            print(f"  {i}. {tagged_player.name}: {role} | Quality: Tier {quality}{metrics_info}")
+        # Show advanced metrics if available
+        metrics_info = ""
+        if tagged_player.advanced_metrics:
+            pp = tagged_player.advanced_metrics.powerplay or {}
+            if pp.get('efscore'):
+                metrics_info = f" | PP-efscore: {pp.get('efscore', 0):.1f}"
         
-    except Exception as e:
-        error_msg = f"Error in batch tagging: {str(e)}"
-        print(f"    [ERROR] {error_msg}")
-        errors.append(error_msg)
-        # Fallback: try individual tagging
-        print(f"\n[FALLBACK] Attempting individual tagging...")
-        for player in players:
-            try:
-                tagged_player = player_tagger.tag_player(player)
-                tagged_players.append(tagged_player)
-                role = tagged_player.primary_role.value if tagged_player.primary_role else "N/A"
-                print(f"  [OK] {player.name}: {role}")
-                time.sleep(0.2)  # Rate limiting
-            except Exception as e2:
-                error_msg = f"Error tagging {player.name}: {str(e2)}"
-                print(f"  [ERROR] {error_msg}")
-                errors.append(error_msg)
-                continue
+        print(f"  {i}. {tagged_player.name}: {role} | Quality: Tier {quality}{metrics_info}")
     
     # Save batch to CSV
     if tagged_players:
         try:
-            tag_storage.save_players(tagged_players, append=True)
+            if write_players is not None:
+                write_players(tagged_players)
+            else:
+                tag_storage.save_players(tagged_players, append=True)
             print(f"\n[OK] Saved {len(tagged_players)} players to CSV")
         except Exception as e:
             print(f"\n[ERROR] Error saving to CSV: {str(e)}")
@@ -161,60 +168,66 @@ def main():
     total_players = system['total_players']
     tagged_count = system['tagged_count']
     
-    # Process in batches of 10
-    batch_size = 10
+    # Process in batches of TAG_BATCH_SIZE (at most what one tagging prompt may carry)
+    batch_size = max(1, min(TAG_BATCH_SIZE, PlayerTagger.MAX_BATCH_SIZE))
     total_batches = (len(untagged_players) + batch_size - 1) // batch_size
     
     print(f"\n[START] Starting automated tagging process...")
     print(f"   Batch size: {batch_size} players")
     print(f"   Total batches: {total_batches}")
-    print(f"   Estimated time: ~{total_batches * 30} seconds (30s per batch)")
+    print(f"   Concurrent batches: {TAG_CONCURRENCY}")
+    print(f"   Estimated time: ~{-(-total_batches // TAG_CONCURRENCY) * 30} seconds (30s per batch)")
     print()
     
-    # Auto-start after 2 seconds (can be interrupted with Ctrl+C)
-    try:
-        print("Starting in 2 seconds... (Press Ctrl+C to cancel)")
-        time.sleep(2)
-    except KeyboardInterrupt:
-        print("\n[CANCELLED] Process cancelled by user")
-        return
-    print()
+    # Auto-start after 2 seconds (can be interrupted with Ctrl+C); the grace period
+    # only helps someone watching a terminal, so scripted runs start straight away
+    if sys.stdin.isatty() and os.getenv('TAG_NO_CONFIRM') != '1':
+        try:
+            print("Starting in 2 seconds... (Press Ctrl+C to cancel)")
+            time.sleep(2)
+        except KeyboardInterrupt:
+            print("\n[CANCELLED] Process cancelled by user")
+            return
+        print()
     
     total_tagged = 0
     total_errors = 0
     
+    batches = [untagged_players[i:i + batch_size] for i in range(0, len(untagged_players), batch_size)]
+    
+    # LLM calls for several batches run at once on worker threads (the Gemini client's
+    # token bucket keeps them within the RPM limit); results are reported and saved
+    # here on the main thread, in batch order
+    executor = ThreadPoolExecutor(max_workers=TAG_CONCURRENCY, thread_name_prefix='tagging')
     try:
-        for batch_num in range(1, total_batches + 1):
-            # Get batch
-            start_idx = (batch_num - 1) * batch_size
-            end_idx = start_idx + batch_size
-            batch = untagged_players[start_idx:end_idx]
-            
-            # Tag batch
-            result = tag_batch(batch, player_tagger, tag_storage, batch_num, total_batches)
-            
-            total_tagged += result['tagged']
-            total_errors += result['errors']
-            
-            # Update progress
-            current_tagged = tagged_count + total_tagged
-            progress = (current_tagged / total_players) * 100
-            
-            print(f"\n[PROGRESS] {current_tagged}/{total_players} players tagged ({progress:.1f}%)")
-            print(f"   [OK] Tagged this batch: {result['tagged']}")
-            if result['errors'] > 0:
-                print(f"   [ERROR] Errors this batch: {result['errors']}")
-            
-            # Show errors if any
-            if result['error_details']:
-                print("\n   Error details:")
-                for err in result['error_details']:
-                    print(f"     - {err}")
-            
-            # Pause between batches (except last)
-            if batch_num < total_batches:
-                print(f"\n[WAIT] Waiting 2 seconds before next batch...")
-                time.sleep(2)
+        with tag_storage.open_append() as write_players:
+            pending = executor.map(lambda batch: request_batch_tags(batch, player_tagger), batches)
+            for batch_num, (batch, batch_tags) in enumerate(zip(batches, pending), 1):
+                # Tag batch
+                result = tag_batch(
+                    batch, player_tagger, tag_storage, batch_num, total_batches,
+                    batch_tags, write_players
+                )
+                
+                total_tagged += result['tagged']
+                total_errors += result['errors']
+                
+                # Update progress (composed into one write per batch rather than a print per line)
+                current_tagged = tagged_count + total_tagged
+                progress = (current_tagged / total_players) * 100
+                
+                report = [
+                    f"\n[PROGRESS] {current_tagged}/{total_players} players tagged ({progress:.1f}%)",
+                    f"   [OK] Tagged this batch: {result['tagged']}"
+                ]
+                if result['errors'] > 0:
+                    report.append(f"   [ERROR] Errors this batch: {result['errors']}")
+                
+                # Show errors if any
+                if result['error_details']:
+                    report.append("\n   Error details:")
+                    report.extend(f"     - {err}" for err in result['error_details'])
+                print("\n".join(report), flush=True)
         
         # Final summary
         print(f"\n{'=' * 60}")
@@ -235,6 +248,9 @@ def main():
         print(f"   You can resume by running this script again")
         print(f"   (Already tagged players will be skipped)")
         print()
+    finally:
+        # Don't start batches that are still queued (e.g. after Ctrl+C)
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":
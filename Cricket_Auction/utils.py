@@ -1,8 +1,35 @@
 """Utility functions."""
 
+from functools import lru_cache
 from typing import Optional, List
 import re
 
+import orjson
+
+
+_CRORES_RE = re.compile(r'(\d+\.?\d*)\s*CR')
+_LAKHS_RE = re.compile(r'(\d+)\s*L')
+_NUMBER_RE = re.compile(r'(\d+\.?\d*)')
+# Only these characters affect brace matching, so the scan can skip everything else in C
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+VALID_TEAM_NAMES = frozenset(['CSK', 'RCB', 'MI', 'KKR', 'DC', 'GT', 'LSG', 'PBKS', 'RR', 'SRH'])
+
+TEAM_NAME_ALIASES = {
+    'CHENNAI': 'CSK',
+    'BANGALORE': 'RCB',
+    'BENGALURU': 'RCB',
+    'MUMBAI': 'MI',
+    'KOLKATA': 'KKR',
+    'DELHI': 'DC',
+    'GUJARAT': 'GT',
+    'LUCKNOW': 'LSG',
+    'PUNJAB': 'PBKS',
+    'RAJASTHAN': 'RR',
+    'HYDERABAD': 'SRH',
+    'SUNRISERS': 'SRH'
+}
+
 
 def lakhs_to_crores(lakhs: int) -> float:
     """Convert lakhs to crores."""
@@ -22,8 +49,33 @@ def format_price(lakhs: int, unit: str = "Cr") -> str:
         return f"{lakhs}L"
 
 
+class PlayerIndex:
+    """Player lookup for repeated match_player_name calls; names are normalized once, up front."""
+    
+    def __init__(self, players: List):
+        """Index players by lowercased, stripped name (first player wins on duplicates)."""
+        self._entries = [(p.name.lower().strip(), p) for p in players if hasattr(p, 'name')]
+        self._exact = {}
+        for player_name, player in self._entries:
+            self._exact.setdefault(player_name, player)
+    
+    def match(self, name: str) -> Optional:
+        """Exact name match in O(1), otherwise the first partial match in list order."""
+        name_lower = name.lower().strip()
+        player = self._exact.get(name_lower)
+        if player is not None:
+            return player
+        for player_name, player in self._entries:
+            if name_lower in player_name or player_name in name_lower:
+                return player
+        return None
+
+
 def match_player_name(name: str, players: List) -> Optional:
-    """Match player name with variations."""
+    """Match player name with variations (pass a PlayerIndex when matching many names against the same players)."""
+    if isinstance(players, PlayerIndex):
+        return players.match(name)
+    
     name_lower = name.lower().strip()
     
     for player in players:
@@ -38,23 +90,24 @@ def match_player_name(name: str, players: List) -> Optional:
     return None
 
 
+@lru_cache(maxsize=256)
 def parse_price_string(price_str: str) -> Optional[int]:
     """Parse price string like '15Cr' or '1500L' to lakhs."""
     price_str = price_str.strip().upper()
     
     # Try crores
-    match = re.search(r'(\d+\.?\d*)\s*CR', price_str)
+    match = _CRORES_RE.search(price_str)
     if match:
         crores = float(match.group(1))
         return crores_to_lakhs(crores)
     
     # Try lakhs
-    match = re.search(r'(\d+)\s*L', price_str)
+    match = _LAKHS_RE.search(price_str)
     if match:
         return int(match.group(1))
     
     # Try just number (assume crores)
-    match = re.search(r'(\d+\.?\d*)', price_str)
+    match = _NUMBER_RE.search(price_str)
     if match:
         crores = float(match.group(1))
         return crores_to_lakhs(crores)
@@ -71,46 +124,59 @@ def validate_player_name(name: str) -> bool:
 
 def validate_team_name(name: str) -> bool:
     """Validate team name."""
-    valid_teams = ['CSK', 'RCB', 'MI', 'KKR', 'DC', 'GT', 'LSG', 'PBKS', 'RR', 'SRH']
-    return name.upper() in valid_teams
+    return name.upper() in VALID_TEAM_NAMES
 
 
+@lru_cache(maxsize=64)
 def normalize_team_name(name: str) -> str:
     """Normalize team name to standard format."""
     name = name.upper().strip()
-    team_mapping = {
-        'CHENNAI': 'CSK',
-        'BANGALORE': 'RCB',
-        'BENGALURU': 'RCB',
-        'MUMBAI': 'MI',
-        'KOLKATA': 'KKR',
-        'DELHI': 'DC',
-        'GUJARAT': 'GT',
-        'LUCKNOW': 'LSG',
-        'PUNJAB': 'PBKS',
-        'RAJASTHAN': 'RR',
-        'HYDERABAD': 'SRH',
-        'SUNRISERS': 'SRH'
-    }
-    return team_mapping.get(name, name)
+    return TEAM_NAME_ALIASES.get(name, name)
+
+
+def extract_json_span(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text (braces inside strings ignored), or None."""
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped_pos = -1
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        pos = match.start()
+        if pos == escaped_pos:
+            continue
+        ch = match.group()
+        if in_string:
+            if ch == '\\':
+                escaped_pos = pos + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    
+    return None
 
 
 def parse_llm_json_response(response: str) -> dict:
     """Parse JSON from LLM response."""
-    import json
-    import re
-    
-    # Try to extract JSON
-    json_match = re.search(r'\{.*\}', response, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group(0))
-        except:
-            pass
+    # Try the first balanced object, then the outermost {...} span (as the old greedy match did)
+    for json_span in (extract_json_span(response), response[response.find('{'):response.rfind('}') + 1]):
+        if json_span:
+            try:
+                return orjson.loads(json_span)
+            except orjson.JSONDecodeError:
+                pass
     
     # Fallback
     try:
-        return json.loads(response)
-    except:
+        return orjson.loads(response)
+    except orjson.JSONDecodeError:
         return {}
-